@@ -172,10 +172,22 @@ class WebsiteWizard {
                     }),
                 });
 
-                const result = await response.json();
+                let result = await response.json();
+
+                // The server mails the archive in the background; poll the
+                // job until it has been sent or has failed
+                const jobId = result.job_id;
+                for (let attempt = 0; attempt < 300 && (result.status === 'accepted' || result.status === 'pending'); attempt++) {
+                    await new Promise(resolve => setTimeout(resolve, 1000));
+                    result = await (await fetch(`/api/send-zip/${jobId}`)).json();
+                }
 
                 if (result.status === 'success') {
-                    alert('Email sent successfully!');
+                    alert(result.message || 'Email sent successfully!');
+                    emailModal.classList.remove('active');
+                } else if (result.status === 'accepted' || result.status === 'pending') {
+                    // Still sending after five minutes; it may yet arrive
+                    alert(result.message);
                     emailModal.classList.remove('active');
                 } else {
                     alert(`Error sending email: ${result.message}`);
@@ -92,7 +92,9 @@ Always prioritize user safety and data security when using tools."""
     def _create_graph(self):
         """Create the LangGraph workflow."""
         
-        # Create tool node
+        # Create tool node. Under graph.ainvoke it runs every tool call of a
+        # message concurrently (asyncio.gather), so async tools such as the
+        # web tools overlap their I/O; they bound their own concurrency.
         tool_node = ToolNode(self.tools)
         
         # Create state graph
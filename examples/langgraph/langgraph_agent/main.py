@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 
 from .runner import LangGraphRunner
 from .core import LangGraphAgent
+from .tools.web_tools import close_session
 
 # Load environment variables
 load_dotenv()
@@ -80,6 +81,9 @@ async def main():
     except Exception as e:
         logger.error(f"Error in main: {e}")
         print(f"❌ Error: {str(e)}")
+    finally:
+        # Release pooled connections held by the web tools
+        await close_session()
 
 
 if __name__ == "__main__":
@@ -34,8 +34,8 @@ from .system_tools import (
     get_disk_usage_tool
 )
 
-# Export all tools
-ALL_TOOLS = [
+# Export all tools (immutable; __all__ is derived so the two can't drift)
+ALL_TOOLS: tuple = (
     # File tools
     read_file_tool,
     write_file_tool,
@@ -59,14 +59,6 @@ ALL_TOOLS = [
     get_environment_variable_tool,
     list_processes_tool,
     get_disk_usage_tool
-]
+)
 
-__all__ = [
-    "ALL_TOOLS",
-    "read_file_tool", "write_file_tool", "edit_file_tool", "search_files_tool",
-    "list_directory_tool", "delete_file_tool", "run_command_tool",
-    "run_interactive_command_tool", "terminate_process_tool", "list_active_processes_tool",
-    "web_search_tool", "read_url_tool", "download_file_tool",
-    "get_current_directory_tool", "change_directory_tool", "get_system_info_tool",
-    "get_environment_variable_tool", "list_processes_tool", "get_disk_usage_tool"
-] 
\ No newline at end of file
+__all__ = ("ALL_TOOLS",) + tuple(t.name for t in ALL_TOOLS)
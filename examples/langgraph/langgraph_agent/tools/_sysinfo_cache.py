@@ -0,0 +1,61 @@
+"""
+Process-lifetime cache for static platform and psutil probes
+Values that cannot change while the process runs are computed once and shared by all tools
+"""
+
+import functools
+import platform
+from typing import Optional
+
+import psutil
+
+
+@functools.cache
+def platform_platform() -> str:
+    return platform.platform()
+
+
+@functools.cache
+def platform_system() -> str:
+    return platform.system()
+
+
+@functools.cache
+def platform_release() -> str:
+    return platform.release()
+
+
+@functools.cache
+def platform_version() -> str:
+    return platform.version()
+
+
+@functools.cache
+def platform_machine() -> str:
+    return platform.machine()
+
+
+@functools.cache
+def platform_processor() -> str:
+    # Reads /proc/cpuinfo or spawns a subprocess depending on the OS
+    return platform.processor()
+
+
+@functools.cache
+def python_version() -> str:
+    return platform.python_version()
+
+
+@functools.cache
+def python_implementation() -> str:
+    return platform.python_implementation()
+
+
+@functools.cache
+def cpu_count(logical: bool = True) -> Optional[int]:
+    return psutil.cpu_count(logical=logical)
+
+
+@functools.cache
+def total_memory() -> int:
+    return psutil.virtual_memory().total
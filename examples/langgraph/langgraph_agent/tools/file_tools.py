@@ -3,15 +3,211 @@ File operation tools for the LangGraph Agent System
 Adapted to use LangChain's @tool decorator for compatibility with LangGraph
 """
 
+import codecs
+import io
 import os
 import glob
+import fnmatch
 import json
+import mmap
 import re
+import stat
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.tools import tool
 
 
+# Files larger than this are refused by read_file_tool
+_MAX_READ_BYTES = int(os.getenv("READ_FILE_MAX_BYTES", str(10 * 1024 * 1024)))
+# Files up to this size are read with a single os.read
+_SMALL_FILE_BYTES = 64 * 1024
+# Files up to this size are kept in the read cache
+_CACHED_READ_BYTES = 1024 * 1024
+
+# path -> ((ino, mtime_ns, size), text) for read_file_tool (LRU). Bounded by
+# the decoded strings' total footprint, since a str can take 4 bytes per char
+_READ_CACHE: "OrderedDict[str, Tuple[Tuple[int, int, int], str]]" = OrderedDict()
+_READ_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_READ_CACHE_LOCK = threading.Lock()
+_read_cache_bytes = 0
+
+def _stat_or_none(path) -> Optional[os.stat_result]:
+    """
+    Stat path once (following symlinks); None if it does not exist.
+    Callers classify the result with stat.S_ISREG/S_ISDIR instead of issuing
+    separate exists()/is_file()/is_dir() syscalls.
+    """
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+# Markers used in directory listings
+_DIR_ICON = "📁"
+_FILE_ICON = "📄"
+
+# Process umask, read once (os.umask can only be queried by setting it); new
+# files get the same 0o666 & ~umask mode a plain open(path, 'w') would
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to fd, retrying on short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    Write data to path via a temp file in the same directory and os.replace,
+    so readers never observe a partially written file. A symlink is followed
+    and its target replaced. The existing file's permission bits are
+    preserved; new files get the umask-derived default mode.
+    """
+    path = Path(os.path.realpath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        try:
+            _write_all(fd, data)
+        finally:
+            os.close(fd)
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_new_file(path: Path, data: bytes) -> None:
+    """
+    Create path and write data to it, failing with FileExistsError if it
+    already exists. O_EXCL makes the existence check and the create a single
+    atomic syscall.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _splice(content, needle, replacement):
+    """
+    Replace every non-overlapping occurrence of needle in content (a str,
+    bytes or mmap) with one left-to-right find() pass, joining the untouched
+    slices around the replacement. Returns (new_content, count); new_content
+    is None when nothing matched.
+    """
+    pieces = []
+    start = 0
+    width = len(needle)
+    index = content.find(needle)
+    while index != -1 and width:
+        pieces.append(content[start:index])
+        start = index + width
+        index = content.find(needle, start)
+    if not pieces:
+        return None, 0
+    count = len(pieces)
+    pieces.append(content[start:])
+    return replacement.join(pieces), count
+
+
+def _check_utf8(data, chunk_size: int = 1024 * 1024) -> None:
+    """
+    Raise UnicodeDecodeError unless data (bytes or mmap) is valid UTF-8,
+    decoding a chunk at a time so no full-size str is ever built.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for start in range(0, len(data), chunk_size):
+        decoder.decode(data[start:start + chunk_size])
+    decoder.decode(b'', final=True)
+
+
+def _read_text(path: str, size: int) -> str:
+    """Read and UTF-8 decode a file whose size is already known from stat."""
+    if 0 < size <= _SMALL_FILE_BYTES:
+        # Small file: right-sized read(2) calls, no buffered IO layer; a
+        # short read keeps going until size bytes or EOF
+        chunks = []
+        remaining = size
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            while remaining > 0:
+                chunk = os.read(fd, remaining)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+        finally:
+            os.close(fd)
+        raw = b"".join(chunks)
+    else:
+        # Large files, and procfs/sysfs files that report size 0 but still
+        # have content, are read to EOF
+        raw = Path(path).read_bytes()
+    return raw.decode('utf-8')
+
+
+def _read_text_cached(path: str, st: os.stat_result) -> str:
+    """_read_text memoized on the file's identity (inode, mtime and size)."""
+    global _read_cache_bytes
+    signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+    with _READ_CACHE_LOCK:
+        entry = _READ_CACHE.get(path)
+        if entry is not None and entry[0] == signature:
+            _READ_CACHE.move_to_end(path)
+            return entry[1]
+    
+    content = _read_text(path, st.st_size)
+    with _READ_CACHE_LOCK:
+        old = _READ_CACHE.pop(path, None)
+        if old is not None:
+            _read_cache_bytes -= sys.getsizeof(old[1])
+        _READ_CACHE[path] = (signature, content)
+        _read_cache_bytes += sys.getsizeof(content)
+        while _read_cache_bytes > _READ_CACHE_MAX_BYTES:
+            _, (_, evicted) = _READ_CACHE.popitem(last=False)
+            _read_cache_bytes -= sys.getsizeof(evicted)
+    return content
+
+
+def _glob_files(directory: str, name_pattern: str) -> Tuple[str, ...]:
+    """Return the files anywhere under directory whose name matches name_pattern."""
+    if '/' in name_pattern or os.sep in name_pattern:
+        # Patterns spanning directories need the full glob machinery
+        return tuple(
+            str(file_path)
+            for file_path in Path(directory).glob(f"**/{name_pattern}")
+            if file_path.is_file()
+        )
+    
+    # os.walk already separates files from directories (via scandir), so no
+    # per-entry Path objects or extra stat calls are needed
+    match = re.compile(fnmatch.translate(name_pattern)).match
+    return tuple(
+        str(Path(root, name))
+        for root, _dirs, files in os.walk(directory)
+        for name in files
+        if match(name)
+    )
+
+
 @tool
 def read_file_tool(file_path: str) -> str:
     """
@@ -25,14 +221,26 @@ def read_file_tool(file_path: str) -> str:
     """
     try:
         path = Path(file_path)
-        if not path.exists():
+        st = _stat_or_none(path)
+        if st is None:
             return f"Error: File '{file_path}' does not exist"
         
-        if not path.is_file():
+        if not stat.S_ISREG(st.st_mode):
             return f"Error: '{file_path}' is not a file"
         
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if st.st_size > _MAX_READ_BYTES:
+            return (
+                f"Error: File '{file_path}' is too large to read "
+                f"({st.st_size} bytes, limit {_MAX_READ_BYTES} bytes)"
+            )
+        
+        if 0 < st.st_size <= _CACHED_READ_BYTES:
+            # Re-reads of an unchanged file (the agent re-checks its edits)
+            # are served from memory; a new inode, mtime or size misses.
+            # Size-0 files (procfs, sysfs) change without touching either
+            content = _read_text_cached(str(path), st)
+        else:
+            content = _read_text(str(path), st.st_size)
         
         return f"Successfully read file '{file_path}':\n\n{content}"
     
@@ -59,19 +267,21 @@ def write_file_tool(file_path: str, content: str, overwrite: bool = False) -> st
     """
     try:
         path = Path(file_path)
+        data = content.encode('utf-8')
+        write = _atomic_write_bytes if overwrite else _write_new_file
         
-        # Check if file exists and overwrite is False
-        if path.exists() and not overwrite:
-            return f"Error: File '{file_path}' already exists. Use overwrite=True to replace it"
-        
-        # Create parent directories if they don't exist
-        path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # The parent directory usually exists, so only create it when the
+        # first attempt reports it missing
+        try:
+            write(path, data)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write(path, data)
         
         return f"Successfully wrote to file '{file_path}'"
     
+    except FileExistsError:
+        return f"Error: File '{file_path}' already exists. Use overwrite=True to replace it"
     except PermissionError:
         return f"Error: Permission denied to write file '{file_path}'"
     except Exception as e:
@@ -93,26 +303,33 @@ def edit_file_tool(file_path: str, search_text: str, replace_text: str) -> str:
     """
     try:
         path = Path(file_path)
-        if not path.exists():
+        st = _stat_or_none(path)
+        if st is None:
             return f"Error: File '{file_path}' does not exist"
         
-        # Read current content
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if st.st_size > _SMALL_FILE_BYTES:
+            # Splice straight out of a read-only mapping: no full read, no
+            # decode/encode round trip, and a miss only pages in what find()
+            # touches. UTF-8 is self-synchronizing, so byte offsets of the
+            # encoded needle are exactly the text matches.
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                new_data, replacements = _splice(
+                    mm, search_text.encode('utf-8'), replace_text.encode('utf-8')
+                )
+                # Same refusal of non-text files as the decoding path below,
+                # paid only when there is something to write
+                if replacements:
+                    _check_utf8(mm)
+        else:
+            content = path.read_bytes().decode('utf-8')
+            new_content, replacements = _splice(content, search_text, replace_text)
+            new_data = new_content.encode('utf-8') if replacements else None
         
-        # Check if search text exists
-        if search_text not in content:
+        if replacements == 0:
             return f"Error: Search text not found in file '{file_path}'"
         
-        # Perform replacement
-        new_content = content.replace(search_text, replace_text)
-        
-        # Write back to file
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        
-        # Count replacements
-        replacements = content.count(search_text)
+        # Write back to file atomically
+        _atomic_write_bytes(path, new_data)
         
         return f"Successfully edited file '{file_path}': {replacements} occurrence(s) replaced"
     
@@ -136,33 +353,31 @@ def search_files_tool(directory: str, pattern: str, file_extension: str = "*") -
         List of matching files
     """
     try:
-        dir_path = Path(directory)
-        if not dir_path.exists():
+        st = _stat_or_none(directory)
+        if st is None:
             return f"Error: Directory '{directory}' does not exist"
         
-        if not dir_path.is_dir():
+        if not stat.S_ISDIR(st.st_mode):
             return f"Error: '{directory}' is not a directory"
         
         # Create search pattern
         if file_extension == "*":
-            search_pattern = f"**/{pattern}"
+            name_pattern = pattern
         else:
-            search_pattern = f"**/{pattern}.{file_extension.lstrip('.')}"
+            name_pattern = f"{pattern}.{file_extension.lstrip('.')}"
         
         # Search for files
-        matches = []
-        for file_path in dir_path.glob(search_pattern):
-            if file_path.is_file():
-                matches.append(str(file_path))
+        matches = _glob_files(directory, name_pattern)
         
         if not matches:
             return f"No files found matching pattern '{pattern}' in directory '{directory}'"
         
-        result = f"Found {len(matches)} file(s) matching pattern '{pattern}':\n"
+        result = io.StringIO()
+        result.write(f"Found {len(matches)} file(s) matching pattern '{pattern}':\n")
         for match in sorted(matches):
-            result += f"  - {match}\n"
+            result.write(f"  - {match}\n")
         
-        return result
+        return result.getvalue()
     
     except Exception as e:
         return f"Error searching files: {str(e)}"
@@ -181,39 +396,44 @@ def list_directory_tool(directory: str, show_hidden: bool = False) -> str:
         Directory listing with file details
     """
     try:
-        dir_path = Path(directory)
-        if not dir_path.exists():
+        st = _stat_or_none(directory)
+        if st is None:
             return f"Error: Directory '{directory}' does not exist"
         
-        if not dir_path.is_dir():
+        if not stat.S_ISDIR(st.st_mode):
             return f"Error: '{directory}' is not a directory"
         
         items = []
-        for item in dir_path.iterdir():
-            if not show_hidden and item.name.startswith('.'):
-                continue
-            
-            item_info = {
-                'name': item.name,
-                'type': 'directory' if item.is_dir() else 'file',
-                'size': item.stat().st_size if item.is_file() else 0,
-                'modified': item.stat().st_mtime
-            }
-            items.append(item_info)
-        
-        # Sort by type (directories first) then by name
-        items.sort(key=lambda x: (x['type'] != 'directory', x['name'].lower()))
+        # scandir yields the entry type from readdir, so only one stat per
+        # visible entry is needed (hidden entries are skipped before stat)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not show_hidden and entry.name.startswith('.'):
+                    continue
+                
+                is_dir = entry.is_dir()
+                st = entry.stat()
+                item_info = {
+                    'name': entry.name,
+                    'type': 'directory' if is_dir else 'file',
+                    'size': st.st_size if entry.is_file() else 0,
+                    'modified': st.st_mtime,
+                    # Sort key: directories first, then case-insensitive name
+                    '_key': (not is_dir, entry.name.lower())
+                }
+                items.append(item_info)
+        
+        items.sort(key=itemgetter('_key'))
         
         if not items:
             return f"Directory '{directory}' is empty"
         
-        result = f"Contents of directory '{directory}':\n"
-        for item in items:
-            type_marker = "📁" if item['type'] == 'directory' else "📄"
-            size_info = f" ({item['size']} bytes)" if item['type'] == 'file' else ""
-            result += f"  {type_marker} {item['name']}{size_info}\n"
-        
-        return result
+        header = f"Contents of directory '{directory}':\n"
+        return header + "".join(
+            f"  {_DIR_ICON} {item['name']}\n" if item['type'] == 'directory'
+            else f"  {_FILE_ICON} {item['name']} ({item['size']} bytes)\n"
+            for item in items
+        )
     
     except PermissionError:
         return f"Error: Permission denied to access directory '{directory}'"
@@ -238,13 +458,14 @@ def delete_file_tool(file_path: str, confirm: bool = False) -> str:
             return f"Error: Deletion requires confirmation. Set confirm=True to proceed with deleting '{file_path}'"
         
         path = Path(file_path)
-        if not path.exists():
+        st = _stat_or_none(path)
+        if st is None:
             return f"Error: Path '{file_path}' does not exist"
         
-        if path.is_file():
+        if stat.S_ISREG(st.st_mode):
             path.unlink()
             return f"Successfully deleted file '{file_path}'"
-        elif path.is_dir():
+        elif stat.S_ISDIR(st.st_mode):
             # For directories, only delete if empty for safety
             try:
                 path.rmdir()
@@ -3,16 +3,102 @@ Shell command execution tools for the LangGraph Agent System
 Adapted to use LangChain's @tool decorator for compatibility with LangGraph
 """
 
+import io
 import subprocess
 import os
+import re
 import signal
+import selectors
 import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 from langchain_core.tools import tool
 
+class _ProcessEntry:
+    """A registered process and the lock serializing interactions with it."""
+    
+    __slots__ = ("proc", "lock")
+    
+    def __init__(self, proc: subprocess.Popen):
+        self.proc = proc
+        self.lock = threading.Lock()
+
+
+class _ProcessRegistry:
+    """
+    Thread-safe registry of interactive processes.
+    
+    Tools may run concurrently in worker threads. The registry lock only
+    guards the mapping; each entry has its own lock, so talking to one
+    process never waits on another.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._procs: Dict[str, _ProcessEntry] = {}
+    
+    def add(self, process_id: str, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs[process_id] = _ProcessEntry(proc)
+    
+    def get(self, process_id: str) -> Optional[_ProcessEntry]:
+        with self._lock:
+            return self._procs.get(process_id)
+    
+    def remove(self, process_id: str) -> None:
+        with self._lock:
+            self._procs.pop(process_id, None)
+    
+    def snapshot(self) -> List[Tuple[str, _ProcessEntry]]:
+        with self._lock:
+            return list(self._procs.items())
+
+
 # Keep track of running processes for interactive commands
-_running_processes: Dict[str, subprocess.Popen] = {}
+_running_processes = _ProcessRegistry()
+
+# Safety blocklists, compiled once so each check is a single scan
+_DANGEROUS_COMMAND_RE = re.compile(
+    r'rm\s+-rf\s+/|rm\s+-rf\s+\*|format|fdisk|mkfs|dd\s+if=|chmod\s+777|chown\s+-R'
+    r'|>\s*/dev/sd|shutdown|reboot|init\s+0|init\s+6',
+    re.IGNORECASE
+)
+_DANGEROUS_INTERACTIVE_RE = re.compile(r'rm\s+-rf|format|shutdown', re.IGNORECASE)
+
+
+def _read_available_output(proc: subprocess.Popen, timeout: float, idle_timeout: float = 0.5) -> str:
+    """
+    Drain stdout/stderr of an interactive process without busy-waiting.
+    
+    Blocks on a selector until output arrives, the overall timeout expires,
+    or the process stays quiet for idle_timeout after producing output.
+    """
+    chunks = []
+    deadline = time.monotonic() + timeout
+    with selectors.DefaultSelector() as sel:
+        for stream in (proc.stdout, proc.stderr):
+            if stream:
+                sel.register(stream, selectors.EVENT_READ)
+        
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            events = sel.select(min(remaining, idle_timeout) if chunks else remaining)
+            if not events:
+                break
+            for key, _ in events:
+                try:
+                    chunk = os.read(key.fd, 65536)
+                except BlockingIOError:
+                    continue
+                if chunk:
+                    chunks.append(chunk)
+                else:
+                    # EOF on this stream
+                    sel.unregister(key.fileobj)
+    
+    return b"".join(chunks).decode(errors="replace").rstrip()
 
 
 @tool
@@ -31,26 +117,9 @@ def run_command_tool(command: str, timeout: int = 30, capture_output: bool = Tru
     """
     try:
         # Safety checks - prevent dangerous commands
-        dangerous_patterns = [
-            'rm -rf /',
-            'rm -rf *',
-            'format',
-            'fdisk',
-            'mkfs',
-            'dd if=',
-            'chmod 777',
-            'chown -R',
-            '> /dev/sd',
-            'shutdown',
-            'reboot',
-            'init 0',
-            'init 6'
-        ]
-        
-        command_lower = command.lower()
-        for pattern in dangerous_patterns:
-            if pattern in command_lower:
-                return f"Error: Command blocked for safety reasons. Contains dangerous pattern: '{pattern}'"
+        match = _DANGEROUS_COMMAND_RE.search(command)
+        if match:
+            return f"Error: Command blocked for safety reasons. Contains dangerous pattern: '{match.group(0)}'"
         
         # Set working directory
         cwd = working_directory if working_directory else os.getcwd()
@@ -58,42 +127,50 @@ def run_command_tool(command: str, timeout: int = 30, capture_output: bool = Tru
         # Execute command
         start_time = time.time()
         
-        result = subprocess.run(
+        pipe = subprocess.PIPE if capture_output else None
+        with subprocess.Popen(
             command,
             shell=True,
-            capture_output=capture_output,
+            stdout=pipe,
+            stderr=pipe,
             text=True,
-            timeout=timeout,
             cwd=cwd,
-            env=os.environ.copy()
-        )
+            # Own session, so a timeout can kill everything the shell spawned
+            start_new_session=True
+            # env omitted: the child inherits os.environ without a dict copy
+        ) as proc:
+            try:
+                stdout, stderr = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                proc.communicate()
+                raise
+        result = subprocess.CompletedProcess(command, proc.returncode, stdout, stderr)
         
         execution_time = time.time() - start_time
         
         # Prepare output
-        output_lines = []
-        output_lines.append(f"Command: {command}")
-        output_lines.append(f"Working Directory: {cwd}")
-        output_lines.append(f"Exit Code: {result.returncode}")
-        output_lines.append(f"Execution Time: {execution_time:.2f} seconds")
-        output_lines.append("")
+        output = io.StringIO()
+        output.write(f"Command: {command}\n")
+        output.write(f"Working Directory: {cwd}\n")
+        output.write(f"Exit Code: {result.returncode}\n")
+        output.write(f"Execution Time: {execution_time:.2f} seconds\n\n")
         
         if result.stdout:
-            output_lines.append("STDOUT:")
-            output_lines.append(result.stdout)
-            output_lines.append("")
+            output.write(f"STDOUT:\n{result.stdout}\n\n")
         
         if result.stderr:
-            output_lines.append("STDERR:")
-            output_lines.append(result.stderr)
-            output_lines.append("")
+            output.write(f"STDERR:\n{result.stderr}\n\n")
         
         if result.returncode == 0:
-            output_lines.append("✅ Command executed successfully")
+            output.write("✅ Command executed successfully")
         else:
-            output_lines.append("❌ Command failed")
+            output.write("❌ Command failed")
         
-        return "\n".join(output_lines)
+        return output.getvalue()
     
     except subprocess.TimeoutExpired:
         return f"Error: Command '{command}' timed out after {timeout} seconds"
@@ -125,7 +202,7 @@ def run_interactive_command_tool(command: str, process_id: str | None = None, in
             process_id = f"proc_{int(time.time())}"
             
             # Safety check
-            if any(dangerous in command.lower() for dangerous in ['rm -rf', 'format', 'shutdown']):
+            if _DANGEROUS_INTERACTIVE_RE.search(command):
                 return f"Error: Interactive command blocked for safety: '{command}'"
             
             proc = subprocess.Popen(
@@ -134,51 +211,35 @@ def run_interactive_command_tool(command: str, process_id: str | None = None, in
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
                 bufsize=0
             )
+            # Output is drained with a selector, so reads must never block
+            os.set_blocking(proc.stdout.fileno(), False)
+            os.set_blocking(proc.stderr.fileno(), False)
             
-            _running_processes[process_id] = proc
+            _running_processes.add(process_id, proc)
             
             return f"Started interactive process '{command}' with ID: {process_id}\nUse this ID for further interactions."
         
         else:
             # Interact with existing process
-            if process_id not in _running_processes:
+            entry = _running_processes.get(process_id)
+            if entry is None:
                 return f"Error: No active process with ID '{process_id}'"
             
-            proc = _running_processes[process_id]
-            
-            # Check if process is still running
-            if proc.poll() is not None:
-                del _running_processes[process_id]
-                return f"Process '{process_id}' has terminated with exit code: {proc.returncode}"
-            
-            # Send input if provided
-            if input_data and proc.stdin:
-                proc.stdin.write(input_data + "\n")
-                proc.stdin.flush()
-            
-            # Read output with timeout
-            output_lines = []
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                try:
-                    # Use select or polling to read without blocking indefinitely
-                    if proc.stdout and proc.stdout.readable():
-                        line = proc.stdout.readline()
-                        if line:
-                            output_lines.append(line.rstrip())
-                        else:
-                            break
-                except:
-                    break
+            with entry.lock:
+                proc = entry.proc
                 
-                if time.time() - start_time > timeout:
-                    break
-            
-            output = "\n".join(output_lines) if output_lines else "No output received"
+                # Check if process is still running
+                if proc.poll() is not None:
+                    _running_processes.remove(process_id)
+                    return f"Process '{process_id}' has terminated with exit code: {proc.returncode}"
+                
+                # Send input if provided
+                if input_data and proc.stdin:
+                    os.write(proc.stdin.fileno(), input_data.encode() + b"\n")
+                
+                output = _read_available_output(proc, timeout) or "No output received"
             
             return f"Process ID: {process_id}\nInput sent: {input_data or 'None'}\n\nOutput:\n{output}"
     
@@ -198,23 +259,25 @@ def terminate_process_tool(process_id: str) -> str:
         Termination status
     """
     try:
-        if process_id not in _running_processes:
+        entry = _running_processes.get(process_id)
+        if entry is None:
             return f"Error: No active process with ID '{process_id}'"
         
-        proc = _running_processes[process_id]
-        
-        # Try graceful termination first
-        proc.terminate()
-        
-        # Wait briefly for graceful shutdown
-        try:
-            proc.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            # Force kill if graceful termination fails
-            proc.kill()
-            proc.wait()
-        
-        del _running_processes[process_id]
+        with entry.lock:
+            proc = entry.proc
+            
+            # Try graceful termination first
+            proc.terminate()
+            
+            # Wait briefly for graceful shutdown
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                # Force kill if graceful termination fails
+                proc.kill()
+                proc.wait()
+            
+            _running_processes.remove(process_id)
         
         return f"Successfully terminated process '{process_id}'"
     
@@ -230,13 +293,17 @@ def list_active_processes_tool() -> str:
     Returns:
         List of active processes
     """
-    if not _running_processes:
+    # Poll outside the registry lock on a snapshot. Popen.poll() is safe to
+    # call concurrently, so a process busy in another tool isn't waited on
+    processes = _running_processes.snapshot()
+    if not processes:
         return "No active interactive processes"
     
     output_lines = ["Active interactive processes:"]
     
-    for proc_id, proc in _running_processes.items():
-        status = "Running" if proc.poll() is None else f"Terminated (exit code: {proc.returncode})"
+    for proc_id, entry in processes:
+        returncode = entry.proc.poll()
+        status = "Running" if returncode is None else f"Terminated (exit code: {returncode})"
         output_lines.append(f"  - {proc_id}: {status}")
     
     return "\n".join(output_lines) 
\ No newline at end of file
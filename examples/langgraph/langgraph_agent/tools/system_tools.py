@@ -3,13 +3,36 @@ System utility tools for the LangGraph Agent System
 Adapted to use LangChain's @tool decorator for compatibility with LangGraph
 """
 
+import asyncio
 import os
-import platform
+import stat
+import heapq
 import psutil
-from pathlib import Path
 from typing import Dict, Any
 from langchain_core.tools import tool
 
+from . import _sysinfo_cache as sysinfo
+
+
+# Whether the system-wide CPU counter has a baseline for non-blocking reads
+_cpu_primed = False
+
+# Window between the two cpu_percent() reads of list_processes_tool, and of
+# the first system-wide reading
+_CPU_SAMPLE_SECONDS = 0.1
+
+
+def _system_cpu_percent() -> float:
+    """
+    System-wide CPU usage since the previous call. The first call has no
+    baseline yet, so it takes one short blocking sample instead.
+    """
+    global _cpu_primed
+    if not _cpu_primed:
+        _cpu_primed = True
+        return psutil.cpu_percent(interval=_CPU_SAMPLE_SECONDS)
+    return psutil.cpu_percent(interval=None)
+
 
 @tool
 def get_current_directory_tool() -> str:
@@ -38,11 +61,12 @@ def change_directory_tool(directory: str) -> str:
         Success or error message
     """
     try:
-        path = Path(directory)
-        if not path.exists():
+        try:
+            st = os.stat(directory)
+        except (FileNotFoundError, NotADirectoryError):
             return f"Error: Directory '{directory}' does not exist"
         
-        if not path.is_dir():
+        if not stat.S_ISDIR(st.st_mode):
             return f"Error: '{directory}' is not a directory"
         
         os.chdir(directory)
@@ -66,28 +90,28 @@ def get_system_info_tool() -> str:
     try:
         info_lines = []
         
-        # Basic system info
+        # Basic system info (platform probes are cached per process)
         info_lines.append("=== SYSTEM INFORMATION ===")
-        info_lines.append(f"Platform: {platform.platform()}")
-        info_lines.append(f"System: {platform.system()}")
-        info_lines.append(f"Release: {platform.release()}")
-        info_lines.append(f"Version: {platform.version()}")
-        info_lines.append(f"Machine: {platform.machine()}")
-        info_lines.append(f"Processor: {platform.processor()}")
+        info_lines.append(f"Platform: {sysinfo.platform_platform()}")
+        info_lines.append(f"System: {sysinfo.platform_system()}")
+        info_lines.append(f"Release: {sysinfo.platform_release()}")
+        info_lines.append(f"Version: {sysinfo.platform_version()}")
+        info_lines.append(f"Machine: {sysinfo.platform_machine()}")
+        info_lines.append(f"Processor: {sysinfo.platform_processor()}")
         info_lines.append("")
         
         # Python info
         info_lines.append("=== PYTHON INFORMATION ===")
-        info_lines.append(f"Python Version: {platform.python_version()}")
-        info_lines.append(f"Python Implementation: {platform.python_implementation()}")
+        info_lines.append(f"Python Version: {sysinfo.python_version()}")
+        info_lines.append(f"Python Implementation: {sysinfo.python_implementation()}")
         info_lines.append("")
         
         # CPU info
         if hasattr(psutil, 'cpu_count'):
             info_lines.append("=== CPU INFORMATION ===")
-            info_lines.append(f"CPU Cores (Physical): {psutil.cpu_count(logical=False)}")
-            info_lines.append(f"CPU Cores (Logical): {psutil.cpu_count(logical=True)}")
-            info_lines.append(f"CPU Usage: {psutil.cpu_percent(interval=1)}%")
+            info_lines.append(f"CPU Cores (Physical): {sysinfo.cpu_count(logical=False)}")
+            info_lines.append(f"CPU Cores (Logical): {sysinfo.cpu_count(logical=True)}")
+            info_lines.append(f"CPU Usage: {_system_cpu_percent()}%")
             info_lines.append("")
         
         # Memory info
@@ -130,8 +154,8 @@ def get_system_info_tool() -> str:
     
     except ImportError:
         return "System information partially available (psutil not installed)\n" + \
-               f"Platform: {platform.platform()}\n" + \
-               f"Python: {platform.python_version()}\n" + \
+               f"Platform: {sysinfo.platform_platform()}\n" + \
+               f"Python: {sysinfo.python_version()}\n" + \
                f"Current Directory: {os.getcwd()}"
     except Exception as e:
         return f"Error getting system information: {str(e)}"
@@ -158,7 +182,7 @@ def get_environment_variable_tool(variable_name: str) -> str:
 
 
 @tool
-def list_processes_tool(limit: int = 10) -> str:
+async def list_processes_tool(limit: int = 10) -> str:
     """
     List running processes (limited for security).
     
@@ -172,19 +196,34 @@ def list_processes_tool(limit: int = 10) -> str:
         if not hasattr(psutil, 'process_iter'):
             return "Process listing not available (psutil not installed or insufficient permissions)"
         
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+        # cpu_percent() measures against the previous call, so prime every
+        # process, let the sample window pass without blocking the event
+        # loop, then read usage over exactly that window
+        procs = list(psutil.process_iter(['pid', 'name']))
+        for proc in procs:
             try:
-                proc_info = proc.as_dict(attrs=['pid', 'name', 'cpu_percent', 'memory_percent'])
-                processes.append(proc_info)
+                proc.cpu_percent(None)
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
+        await asyncio.sleep(_CPU_SAMPLE_SECONDS)
         
-        # Sort by CPU usage
-        processes.sort(key=lambda x: x.get('cpu_percent', 0), reverse=True)
+        # memory_percent() would re-read /proc/meminfo for every process
+        total_memory = sysinfo.total_memory()
+        
+        processes = []
+        for proc in procs:
+            try:
+                processes.append({
+                    'pid': proc.info['pid'],
+                    'name': proc.info['name'] or 'N/A',
+                    'cpu_percent': proc.cpu_percent(None),
+                    'memory_percent': proc.memory_info().rss / total_memory * 100
+                })
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
         
-        # Limit results
-        processes = processes[:limit]
+        # Keep the top processes by CPU usage
+        processes = heapq.nlargest(limit, processes, key=lambda x: x['cpu_percent'])
         
         if not processes:
             return "No process information available"
@@ -3,12 +3,206 @@ Web access tools for the LangGraph Agent System
 Adapted to use LangChain's @tool decorator for compatibility with LangGraph
 """
 
-import requests
+import asyncio
+import os
 import re
-from urllib.parse import urljoin, urlparse
-from typing import List, Dict, Any
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+
+import aiohttp
+from aiolimiter import AsyncLimiter
 from langchain_core.tools import tool
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+# Scheme and host check used to validate URLs before any request is made
+_URL_RE = re.compile(r'^https?://([^/\s]+)', re.IGNORECASE)
+
+
+# HTML stripping patterns for the fallback path without selectolax
+_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+_STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+# Request headers (read_url_tool mimics a browser); never mutated
+_READ_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+}
+_DOWNLOAD_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+# read_url_tool never downloads more than this; the output is truncated far below it
+_MAX_BODY_BYTES = 1 << 20
+# HTML beyond this rarely adds to the first 5000 characters of extracted text
+_MAX_HTML_BYTES = 512 * 1024
+# Enough raw bytes for 5000 characters of plain text in any UTF-8 mix
+_MAX_TEXT_BYTES = 64 * 1024
+
+
+# download_file_tool writes to disk in blocks of this size
+_DOWNLOAD_CHUNK_BYTES = 1 << 20
+
+
+# Bounds in-flight requests when ToolNode runs several web tool calls at once
+_MAX_CONCURRENT_REQUESTS = 20
+_REQUEST_SEMAPHORE = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+
+
+# Per-host request rate (requests per second) and retry policy for 429/5xx
+_HOST_RATE_LIMIT = 10
+_HOST_LIMITERS: Dict[str, AsyncLimiter] = {}
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRIES = 3
+_MAX_RETRY_DELAY = 30.0
+
+
+# url -> (ETag, Last-Modified, tool output) for conditional re-fetches (LRU)
+_URL_CACHE: "OrderedDict[str, Tuple[Optional[str], Optional[str], str]]" = OrderedDict()
+_URL_CACHE_MAXSIZE = 256
+
+
+# Shared HTTP session: connections are pooled and kept alive across tool calls
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the shared session, creating it on first use in the running loop."""
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=10,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True,
+        )
+        _SESSION = aiohttp.ClientSession(connector=connector)
+    return _SESSION
+
+
+def _host_limiter(host: str) -> AsyncLimiter:
+    """Return the rate limiter for host, creating it on first use."""
+    limiter = _HOST_LIMITERS.get(host)
+    if limiter is None:
+        limiter = _HOST_LIMITERS[host] = AsyncLimiter(_HOST_RATE_LIMIT, 1)
+    return limiter
+
+
+def _retry_delay(response: aiohttp.ClientResponse, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if given, else exponential."""
+    retry_after = response.headers.get('Retry-After', '')
+    if retry_after.isdigit():
+        return min(float(retry_after), _MAX_RETRY_DELAY)
+    return min(float(2 ** attempt), _MAX_RETRY_DELAY)
+
+
+@asynccontextmanager
+async def _fetch(url: str, host: str, headers: Dict[str, str], timeout: int) -> AsyncIterator[aiohttp.ClientResponse]:
+    """
+    GET url on the shared session, rate limited per host. 429 and 5xx
+    responses are retried with backoff before being handed to the caller;
+    timeout bounds all attempts together, not each one.
+    """
+    session = await _get_session()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    attempt = 0
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        async with _host_limiter(host):
+            response = await session.get(
+                url, headers=headers, timeout=aiohttp.ClientTimeout(total=remaining)
+            )
+        if response.status not in _RETRY_STATUSES or attempt >= _MAX_RETRIES:
+            break
+        delay = _retry_delay(response, attempt)
+        # Hand back the retryable response rather than sleep past the deadline
+        if loop.time() + delay >= deadline:
+            break
+        response.release()
+        attempt += 1
+        await asyncio.sleep(delay)
+    try:
+        yield response
+    finally:
+        response.release()
+
+
+async def _read_capped(response: aiohttp.ClientResponse, limit: int) -> bytes:
+    """
+    Read at most limit bytes of the decoded response body. Content-Length
+    counts compressed bytes, so the cap is enforced while streaming.
+    """
+    chunks = []
+    received = 0
+    async for chunk in response.content.iter_chunked(65536):
+        chunks.append(chunk)
+        received += len(chunk)
+        if received >= limit:
+            break
+    return b"".join(chunks)[:limit]
+
+
+def _write_all(f, data: bytearray) -> int:
+    """Write all of data to an unbuffered file, retrying on short writes."""
+    written = f.write(data)
+    while written < len(data):
+        written += f.write(data[written:])
+    return written
+
+
+_SIZE_UNITS = ('bytes', 'KB', 'MB')
+
+
+def _format_size(num_bytes: int) -> str:
+    """
+    Human-readable size; the unit index comes straight from bit_length().
+    A unit is used only above its threshold, so 1024 bytes stays '1024 bytes'.
+    """
+    index = min((max(num_bytes - 1, 1).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    if not index:
+        return f"{num_bytes} bytes"
+    return f"{num_bytes / (1 << (10 * index)):.1f} {_SIZE_UNITS[index]}"
+
+
+def _html_to_text(html: str) -> str:
+    """Extract visible text from an HTML document, dropping scripts and styles."""
+    if LexborHTMLParser is not None:
+        # Parse and extract text in C (Lexbor)
+        tree = LexborHTMLParser(html)
+        for node in tree.css('script, style'):
+            node.decompose()
+        root = tree.body or tree.root
+        text = root.text(separator=' ', strip=True) if root is not None else ''
+    else:
+        # Regex fallback when selectolax is not installed
+        text = _SCRIPT_RE.sub('', html)
+        text = _STYLE_RE.sub('', text)
+        text = _TAG_RE.sub('', text)
+    
+    # Collapse whitespace runs in one C-level pass (no regex)
+    return ' '.join(text.split())
+
+
+async def close_session() -> None:
+    """Close the shared HTTP session (call once on shutdown)."""
+    global _SESSION
+    if _SESSION is not None and not _SESSION.closed:
+        await _SESSION.close()
+    _SESSION = None
+
 
 @tool
 def web_search_tool(query: str, num_results: int = 5) -> str:
@@ -52,7 +246,7 @@ Status: Demo mode - replace with real implementation
 
 
 @tool
-def read_url_tool(url: str, timeout: int = 30) -> str:
+async def read_url_tool(url: str, timeout: int = 30) -> str:
     """
     Read content from a URL.
     
@@ -65,73 +259,101 @@ def read_url_tool(url: str, timeout: int = 30) -> str:
     """
     try:
         # Validate URL
-        parsed_url = urlparse(url)
-        if not parsed_url.scheme or not parsed_url.netloc:
+        url_match = _URL_RE.match(url)
+        if not url_match:
             return f"Error: Invalid URL format: '{url}'"
+        host = url_match.group(1).lower()
         
-        # Set headers to mimic a browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        }
+        headers = _READ_HEADERS
         
-        # Make request
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
+        # Revalidate a previously read page instead of downloading it again
+        cached = _URL_CACHE.get(url)
+        if cached is not None:
+            etag, last_modified, _ = cached
+            headers = dict(headers)
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
         
-        # Get content type
-        content_type = response.headers.get('content-type', '').lower()
+        # Make request
+        async with _REQUEST_SEMAPHORE, _fetch(url, host, headers, timeout) as response:
+            if response.status == 304 and cached is not None:
+                # Unchanged: no body was sent, reuse the parsed result
+                _URL_CACHE.move_to_end(url)
+                return cached[2]
+            
+            response.raise_for_status()
+            
+            # Get content type; it decides how much of the body is worth reading
+            content_type = response.headers.get('content-type', '').lower()
+            if 'text/html' in content_type:
+                body_limit = _MAX_HTML_BYTES
+            elif 'application/json' in content_type:
+                body_limit = _MAX_BODY_BYTES
+            elif 'text/' in content_type:
+                body_limit = _MAX_TEXT_BYTES
+            else:
+                # Binary content is never displayed, so it is never downloaded
+                body_limit = 0
+            body = await _read_capped(response, body_limit) if body_limit else b""
+            encoding = response.charset or 'utf-8'
+            content_length = response.content_length
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
         
         # Handle different content types
         if 'text/html' in content_type:
             # For HTML, extract text content (basic parsing)
-            content = response.text
-            
-            # Remove script and style elements
-            content = re.sub(r'<script[^>]*>.*?</script>', '', content, flags=re.DOTALL | re.IGNORECASE)
-            content = re.sub(r'<style[^>]*>.*?</style>', '', content, flags=re.DOTALL | re.IGNORECASE)
-            
-            # Remove HTML tags
-            content = re.sub(r'<[^>]+>', '', content)
-            
-            # Clean up whitespace
-            content = re.sub(r'\s+', ' ', content).strip()
+            content = _html_to_text(body.decode(encoding, errors='replace'))
             
             # Limit content length for output
             if len(content) > 5000:
                 content = content[:5000] + "... [Content truncated]"
             
-            return f"Successfully read from URL: {url}\nContent-Type: {content_type}\n\nContent:\n{content}"
+            result = f"Successfully read from URL: {url}\nContent-Type: {content_type}\n\nContent:\n{content}"
         
         elif 'application/json' in content_type:
-            return f"Successfully read JSON from URL: {url}\n\nContent:\n{response.text}"
+            content = body.decode(encoding, errors='replace')
+            if len(body) >= _MAX_BODY_BYTES:
+                content += "... [Content truncated]"
+            result = f"Successfully read JSON from URL: {url}\n\nContent:\n{content}"
         
         elif 'text/' in content_type:
-            content = response.text
+            content = body.decode(encoding, errors='replace')
             if len(content) > 5000:
                 content = content[:5000] + "... [Content truncated]"
-            return f"Successfully read text from URL: {url}\nContent-Type: {content_type}\n\nContent:\n{content}"
+            result = f"Successfully read text from URL: {url}\nContent-Type: {content_type}\n\nContent:\n{content}"
+        
+        else:
+            size = f"{content_length} bytes" if content_length is not None else "unknown"
+            result = f"Successfully accessed URL: {url}\nContent-Type: {content_type}\nContent-Length: {size}\nNote: Binary content not displayed"
         
+        # Only pages the server can revalidate are worth keeping
+        if etag or last_modified:
+            _URL_CACHE[url] = (etag, last_modified, result)
+            _URL_CACHE.move_to_end(url)
+            if len(_URL_CACHE) > _URL_CACHE_MAXSIZE:
+                _URL_CACHE.popitem(last=False)
         else:
-            return f"Successfully accessed URL: {url}\nContent-Type: {content_type}\nContent-Length: {len(response.content)} bytes\nNote: Binary content not displayed"
+            _URL_CACHE.pop(url, None)
+        
+        return result
     
-    except requests.exceptions.Timeout:
+    except asyncio.TimeoutError:
         return f"Error: Request to '{url}' timed out after {timeout} seconds"
-    except requests.exceptions.ConnectionError:
+    except aiohttp.ClientConnectionError:
         return f"Error: Could not connect to '{url}'"
-    except requests.exceptions.HTTPError as e:
-        return f"Error: HTTP error {e.response.status_code} when accessing '{url}'"
-    except requests.exceptions.RequestException as e:
+    except aiohttp.ClientResponseError as e:
+        return f"Error: HTTP error {e.status} when accessing '{url}'"
+    except aiohttp.ClientError as e:
         return f"Error: Request failed for '{url}': {str(e)}"
     except Exception as e:
         return f"Error reading URL '{url}': {str(e)}"
 
 
 @tool
-def download_file_tool(url: str, local_path: str, timeout: int = 60) -> str:
+async def download_file_tool(url: str, local_path: str, timeout: int = 60) -> str:
     """
     Download a file from URL to local path.
     
@@ -145,57 +367,64 @@ def download_file_tool(url: str, local_path: str, timeout: int = 60) -> str:
     """
     try:
         # Validate URL
-        parsed_url = urlparse(url)
-        if not parsed_url.scheme or not parsed_url.netloc:
+        url_match = _URL_RE.match(url)
+        if not url_match:
             return f"Error: Invalid URL format: '{url}'"
+        host = url_match.group(1).lower()
         
-        # Set headers
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        headers = _DOWNLOAD_HEADERS
         
         # Make request with streaming
-        response = requests.get(url, headers=headers, timeout=timeout, stream=True)
-        response.raise_for_status()
-        
-        # Get file size if available
-        file_size = response.headers.get('content-length')
-        if file_size:
-            file_size = int(file_size)
-            file_size_mb = file_size / (1024 * 1024)
+        async with _REQUEST_SEMAPHORE, _fetch(url, host, headers, timeout) as response:
+            response.raise_for_status()
             
-            # Safety check for large files
-            if file_size_mb > 100:  # 100MB limit
-                return f"Error: File too large ({file_size_mb:.1f} MB). Maximum allowed: 100 MB"
-        
-        # Create directory if it doesn't exist
-        from pathlib import Path
-        Path(local_path).parent.mkdir(parents=True, exist_ok=True)
-        
-        # Download file
-        downloaded_bytes = 0
-        with open(local_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded_bytes += len(chunk)
-        
-        # Format file size
-        if downloaded_bytes > 1024 * 1024:
-            size_str = f"{downloaded_bytes / (1024 * 1024):.1f} MB"
-        elif downloaded_bytes > 1024:
-            size_str = f"{downloaded_bytes / 1024:.1f} KB"
-        else:
-            size_str = f"{downloaded_bytes} bytes"
+            # Get file size if available
+            file_size = response.headers.get('content-length')
+            if file_size:
+                file_size = int(file_size)
+                file_size_mb = file_size / (1024 * 1024)
+                
+                # Safety check for large files
+                if file_size_mb > 100:  # 100MB limit
+                    return f"Error: File too large ({file_size_mb:.1f} MB). Maximum allowed: 100 MB"
+            
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+            
+            # Download file: coalesce network reads into large unbuffered writes
+            downloaded_bytes = 0
+            buffer = bytearray()
+            with open(local_path, 'wb', buffering=0) as f:
+                # Reserve contiguous space up front when the final size is known
+                # (Content-Length is the compressed size for encoded bodies)
+                preallocated = bool(
+                    file_size
+                    and hasattr(os, 'posix_fallocate')
+                    and 'content-encoding' not in response.headers
+                )
+                if preallocated:
+                    os.posix_fallocate(f.fileno(), 0, file_size)
+                
+                async for chunk in response.content.iter_chunked(_DOWNLOAD_CHUNK_BYTES):
+                    buffer += chunk
+                    if len(buffer) >= _DOWNLOAD_CHUNK_BYTES:
+                        downloaded_bytes += _write_all(f, buffer)
+                        buffer.clear()
+                if buffer:
+                    downloaded_bytes += _write_all(f, buffer)
+                
+                if preallocated and downloaded_bytes < file_size:
+                    # Drop the unused tail of a short body
+                    f.truncate(downloaded_bytes)
         
-        return f"Successfully downloaded file from '{url}' to '{local_path}'\nSize: {size_str}"
+        return f"Successfully downloaded file from '{url}' to '{local_path}'\nSize: {_format_size(downloaded_bytes)}"
     
-    except requests.exceptions.Timeout:
+    except asyncio.TimeoutError:
         return f"Error: Download from '{url}' timed out after {timeout} seconds"
-    except requests.exceptions.ConnectionError:
+    except aiohttp.ClientConnectionError:
         return f"Error: Could not connect to '{url}'"
-    except requests.exceptions.HTTPError as e:
-        return f"Error: HTTP error {e.response.status_code} when downloading from '{url}'"
+    except aiohttp.ClientResponseError as e:
+        return f"Error: HTTP error {e.status} when downloading from '{url}'"
     except PermissionError:
         return f"Error: Permission denied to write file '{local_path}'"
     except Exception as e:
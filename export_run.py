@@ -1,28 +1,83 @@
 import os
-import json
+import asyncio
+import orjson
 from dotenv import load_dotenv
 from langsmith import Client
-from langsmith.utils import LangSmithAuthError
+from langsmith.utils import (
+    LangSmithAuthError,
+    LangSmithAPIError,
+    LangSmithConnectionError,
+    LangSmithRateLimitError,
+)
 import requests
-from uuid import UUID
-from datetime import datetime
 from decimal import Decimal
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+# Errors worth retrying: rate limits, 5xx and dropped connections
+TRANSIENT_ERRORS = (
+    LangSmithRateLimitError,
+    LangSmithAPIError,
+    LangSmithConnectionError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+# Maximum runs fetched at once when exporting several run IDs
+MAX_CONCURRENT_EXPORTS = 16
 
 def json_serializer(obj):
-    """Custom JSON serializer to handle UUID, datetime, and Decimal objects."""
-    if isinstance(obj, UUID):
-        return str(obj)
-    if isinstance(obj, datetime):
-        return obj.isoformat()
+    """Custom JSON serializer for Decimal (orjson handles UUID and datetime natively)."""
     if isinstance(obj, Decimal):
         return float(obj)
     raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
+@retry(
+    retry=retry_if_exception_type(TRANSIENT_ERRORS),
+    wait=wait_exponential(multiplier=1, min=1, max=30),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+def read_run_with_retry(client, run_id):
+    """Fetch a run, backing off exponentially on transient failures."""
+    return client.read_run(run_id=run_id)
+
+
+def save_run(client, run_id, log_directory="logs"):
+    """Fetch one run and write it to '<log_directory>/<run_id>.json'."""
+    run = read_run_with_retry(client, run_id)
+    run_data = run.dict()
+
+    file_path = os.path.join(log_directory, f"{run_id}.json")
+    with open(file_path, 'wb') as f:
+        f.write(orjson.dumps(
+            run_data,
+            default=json_serializer,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ))
+    return file_path
+
+
+async def export_many(client, run_ids, log_directory="logs"):
+    """Export several runs concurrently, bounded by MAX_CONCURRENT_EXPORTS."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXPORTS)
+
+    async def export_one(run_id):
+        async with semaphore:
+            # The LangSmith client is blocking; overlap the fetches in threads
+            return await asyncio.to_thread(save_run, client, run_id, log_directory)
+
+    return await asyncio.gather(
+        *(export_one(run_id) for run_id in run_ids),
+        return_exceptions=True
+    )
+
+
 def export_langsmith_run():
     """
     Connects to Langsmith, fetches a run by ID, and saves its data to a file
-    in a 'logs' directory, named after the run ID.
+    in a 'logs' directory, named after the run ID. Several comma-separated
+    IDs are exported concurrently.
     """
     load_dotenv()
     print("Attempting to load environment variables from .env file...")
@@ -33,10 +88,7 @@ def export_langsmith_run():
         if not run_id_to_export:
             print("❌ Error: The 'RUN_ID_TO_EXPORT' variable is not set in your .env file.")
             return
-
-        print(f"Fetching data for run ID: {run_id_to_export}...")
-        run = client.read_run(run_id=run_id_to_export)
-        run_data = run.dict()
+        run_ids = [run_id.strip() for run_id in run_id_to_export.split(",") if run_id.strip()]
 
         # --- New File Saving Logic ---
         
@@ -44,15 +96,22 @@ def export_langsmith_run():
         log_directory = "logs"
         os.makedirs(log_directory, exist_ok=True)
 
-        # 2. Construct the full file path using the run ID as the name.
-        file_path = os.path.join(log_directory, f"{run_id_to_export}.json")
-        
-        # 3. Write the JSON data to the file.
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(run_data, f, indent=2, default=json_serializer)
-        
-        # 4. Print a confirmation message.
-        print(f"\n✅ Successfully fetched and saved run data to: {file_path}")
+        if len(run_ids) == 1:
+            # 2. Fetch the run and write its JSON data, named after the run ID.
+            print(f"Fetching data for run ID: {run_ids[0]}...")
+            file_path = save_run(client, run_ids[0], log_directory)
+
+            # 3. Print a confirmation message.
+            print(f"\n✅ Successfully fetched and saved run data to: {file_path}")
+            return
+
+        print(f"Fetching data for {len(run_ids)} runs...")
+        results = asyncio.run(export_many(client, run_ids, log_directory))
+        for run_id, result in zip(run_ids, results):
+            if isinstance(result, Exception):
+                print(f"❌ Failed to export run {run_id}: {result}")
+            else:
+                print(f"✅ Saved run data to: {result}")
 
     except LangSmithAuthError:
         print("\n❌ Authentication Error: Failed to authenticate with Langsmith.")
@@ -64,4 +123,4 @@ def export_langsmith_run():
         print(f"\nAn unexpected error occurred: {e}")
 
 if __name__ == "__main__":
-    export_langsmith_run()
\ No newline at end of file
+    export_langsmith_run()
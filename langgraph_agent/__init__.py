@@ -3,16 +3,29 @@ LangGraph Agent System - A graph-based AI agent implementation
 Built with LangGraph and LangSmith for enhanced observability and workflow control
 """
 
-try:
-    from .core import LangGraphAgent
-    from .runner import LangGraphRunner
-    from .state import AgentState
-except ImportError as e:
-    # Handle graceful import failure during development
-    print(f"Warning: Import error in langgraph_agent package: {e}")
-    LangGraphAgent = None
-    LangGraphRunner = None
-    AgentState = None
+import importlib
 
 __version__ = "1.0.0"
-__all__ = ["LangGraphAgent", "LangGraphRunner", "AgentState"] 
\ No newline at end of file
+__all__ = ["LangGraphAgent", "LangGraphRunner", "AgentState", "SemanticResponseCache"]
+
+# Public names are resolved lazily so importing a submodule (e.g. running
+# ``python -m langgraph_agent.main``) doesn't pull in the whole LangChain stack.
+_LAZY_EXPORTS = {
+    "LangGraphAgent": ".core",
+    "LangGraphRunner": ".runner",
+    "AgentState": ".state",
+    "SemanticResponseCache": ".semantic_cache",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    except ImportError as e:
+        # Handle graceful import failure during development
+        print(f"Warning: Import error in langgraph_agent package: {e}")
+        value = None
+    globals()[name] = value
+    return value
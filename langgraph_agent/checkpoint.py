@@ -0,0 +1,35 @@
+"""
+Checkpoint savers for the LangGraph Agent System
+In-memory saver that keeps only the most recently written threads
+"""
+
+from collections import OrderedDict
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import MemorySaver
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    MemorySaver that evicts the least recently written threads.
+
+    A plain MemorySaver keeps every thread's full history for the lifetime
+    of the process. This one keeps at most max_threads threads; older ones
+    are dropped whole (with their pending writes and blobs) via delete_thread.
+    Async writes delegate to put(), so both paths are bounded.
+    """
+
+    def __init__(self, max_threads: int = 1000, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self._thread_order: "OrderedDict[str, None]" = OrderedDict()
+
+    def put(self, config: RunnableConfig, checkpoint, metadata, new_versions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        self._thread_order[thread_id] = None
+        self._thread_order.move_to_end(thread_id)
+        while len(self._thread_order) > self.max_threads:
+            evicted, _ = self._thread_order.popitem(last=False)
+            self.delete_thread(evicted)
+        return super().put(config, checkpoint, metadata, new_versions)
@@ -4,39 +4,414 @@ A graph-based AI agent with LangSmith tracing and tool integration
 """
 
 import os
+import time
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional, Literal
+import weakref
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+from typing import Dict, Any, List, Optional, Literal, AsyncIterator, Callable, Tuple
 from datetime import datetime
 
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import ChatOpenAI
-# Add DeepSeek import
-try:
-    from langchain_deepseek import ChatDeepSeek
-except ImportError:
-    ChatDeepSeek = None  # Handle missing package gracefully
-from langchain_core.tools import BaseTool
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
-from .state import AgentState, create_initial_state
-# Remove: from .tools import ALL_TOOLS
-# Add MCP imports
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from .state import AgentState, create_initial_state, format_timestamp, tool_result_entry
+from .semantic_cache import SemanticResponseCache
+# Chat model, MCP client, prebuilt ToolNode and checkpointer imports are
+# deferred to first use to keep CLI startup fast.
 import asyncio
-import json
+import orjson
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=128)
+def _session_system_message(
+    system_prompt: str, working_directory: str, user_name: str, session_id: str
+) -> SystemMessage:
+    """
+    Build the system message for one session: the agent prompt followed by the
+    session's static context. Cached, so every turn of a session sends the
+    identical prefix and only the iteration counter is sent separately.
+    """
+    return SystemMessage(content="".join((
+        system_prompt,
+        "\nCurrent Context:\n",
+        "- Working Directory: ", str(working_directory), "\n",
+        "- User: ", str(user_name), "\n",
+        "- Session: ", str(session_id), "\n",
+    )))
+
+
+@lru_cache(maxsize=64)
+def _iteration_message(iteration: int) -> SystemMessage:
+    """Per-turn context message; iterations are bounded, so each is built once."""
+    return SystemMessage(content=f"Iteration: {iteration}")
+
+
+# User-facing error replies; only the exception text varies
+_REQUEST_ERROR_PREFIX = "I encountered an error while processing your request: "
+_AGENT_ERROR_TEMPLATE = _REQUEST_ERROR_PREFIX + """{}
+
+**Troubleshooting Tips:**
+1. If this is a file edit error, the issue might be with HTML formatting differences
+2. Try being more specific about the content to change
+3. Some edits may have succeeded partially - check the output files
+
+Please try again or rephrase your request."""
+
+
+_SYSTEM_PROMPT_PATH = os.path.join(os.path.dirname(__file__), 'prompt', 'system_prompt.txt')
+_MCP_CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'tools', 'mcp.json')
+
+
+@lru_cache(maxsize=1)
+def _load_default_prompt(prompt_path: str) -> str:
+    """Read the default system prompt once per process."""
+    try:
+        with open(prompt_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except Exception as e:
+        # Fallback to a minimal prompt if file is missing or unreadable
+        logger.warning("Could not load system prompt from %s: %s", prompt_path, e)
+        return "You are an AI assistant. Use tools to help the user."
+
+
+@lru_cache(maxsize=32)
+def _format_tool_info(tool_entries: Tuple[Tuple[str, str], ...]) -> str:
+    """Render the tool list appended to the system prompt, once per tool set."""
+    tool_info_str = "\n".join(f"{name}: {description}" for name, description in tool_entries)
+    return (
+        f"\n\nYou have access to the following MCP tools:\n{tool_info_str}\n"
+        "When asked about your capabilities, list these tools and their descriptions."
+    )
+
+
+@lru_cache(maxsize=32)
+def _compose_system_prompt(base_prompt: str, tool_entries: Tuple[Tuple[str, str], ...]) -> str:
+    """
+    Join the base prompt and the tool block once per configuration.
+    
+    Agents configured alike get the same string object, so its hash (used in
+    the graph and session-message cache keys) is computed only once.
+    """
+    return base_prompt + _format_tool_info(tool_entries)
+
+
+@lru_cache(maxsize=1)
+def _read_mcp_config(config_path: str, mtime: float) -> Dict[str, Any]:
+    """Parse the MCP server configuration; cached until the file changes (treat as read-only)."""
+    with open(config_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def _load_mcp_config(config_path: str) -> Dict[str, Any]:
+    """Return the MCP server configuration, re-parsing only after edits to the file."""
+    return _read_mcp_config(config_path, os.path.getmtime(config_path))
+
+
+# MCP servers loaded by ainit; others in mcp.json are left disabled
+_MCP_ENABLED_SERVERS = ("sequential-thinking",)
+
+# MCP clients and tools shared by every agent built with ainit
+_MCP_CLIENTS: List[Any] = []
+_MCP_TOOLS: Optional[List[Any]] = None
+_MCP_TOOLS_LOCK = asyncio.Lock()
+
+
+def _import_custom_tools() -> List[Any]:
+    """Import the custom tools; run off the event loop since it is slow."""
+    from .tools import CUSTOM_TOOLS
+    return CUSTOM_TOOLS
+
+
+_HTTP_CLIENTS = None
+
+# Responses for idempotent (temperature ~0) requests, most recently used last
+_RESPONSE_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_RESPONSE_CACHE_MAXSIZE = 256
+
+
+def get_shared_http_clients():
+    """
+    Return the process-wide (sync, async) httpx clients used by the chat models.
+    
+    Sharing them keeps TLS connections alive across agents and requests, and
+    HTTP/2 lets concurrent requests multiplex over one connection.
+    """
+    global _HTTP_CLIENTS
+    if _HTTP_CLIENTS is None:
+        import httpx
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        _HTTP_CLIENTS = (
+            httpx.Client(http2=True, timeout=60, limits=limits),
+            httpx.AsyncClient(http2=True, timeout=60, limits=limits)
+        )
+    return _HTTP_CLIENTS
+
+
+async def close_shared_http_clients() -> None:
+    """Close the shared httpx clients (call once on shutdown)."""
+    global _HTTP_CLIENTS
+    if _HTTP_CLIENTS is not None:
+        http_client, http_async_client = _HTTP_CLIENTS
+        _HTTP_CLIENTS = None
+        http_client.close()
+        await http_async_client.aclose()
+
+
+# Tool-bound chat models keyed by (model, temperature, tool names)
+_CHAT_MODELS: Dict[tuple, Any] = {}
+
+
+def get_chat_model(model: str, temperature: float, tools: List[Any]) -> Any:
+    """
+    Return the tool-bound chat model for these settings, building it once.
+    
+    Agents created per session or per request reuse the same model object
+    (and its pooled HTTP/2 connections) instead of re-validating a new one.
+    """
+    key = (model, temperature, tuple(tool.name for tool in tools))
+    llm = _CHAT_MODELS.get(key)
+    if llm is not None:
+        return llm
+    
+    # LLM selection logic (all models share pooled HTTP connections)
+    http_client, http_async_client = get_shared_http_clients()
+    if model.lower().startswith("deepseek"):
+        try:
+            from langchain_deepseek import ChatDeepSeek
+        except ImportError:
+            raise ImportError("langchain-deepseek is not installed. Please install it to use DeepSeek models.")
+        llm = ChatDeepSeek(
+            model=model,
+            temperature=temperature,
+            http_client=http_client,
+            http_async_client=http_async_client
+        )
+        # Optionally bind tools if supported
+        if hasattr(llm, 'bind_tools'):
+            llm = llm.bind_tools(tools)
+    else:
+        from langchain_openai import ChatOpenAI
+        llm = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            http_client=http_client,
+            http_async_client=http_async_client
+        ).bind_tools(tools)
+    _CHAT_MODELS[key] = llm
+    return llm
+
+
+_LLM_CACHE_CONFIGURED = False
+
+
+def configure_llm_cache(backend: Optional[str] = None) -> None:
+    """
+    Install the process-wide LangChain LLM cache selected by LLM_CACHE.
+    
+    Supported backends are "memory" and "sqlite" (LLM_CACHE_DB, defaults to
+    .langgraph_cache.db); unset or "none" leaves caching off. Chat models
+    consult the global cache on every call, keyed by prompt and model
+    parameters, so identical calls skip the network round-trip. Only the
+    first call in a process has any effect.
+    """
+    global _LLM_CACHE_CONFIGURED
+    if _LLM_CACHE_CONFIGURED:
+        return
+    _LLM_CACHE_CONFIGURED = True
+    backend = (backend or os.getenv("LLM_CACHE", "none")).lower()
+    if backend == "none":
+        return
+    from langchain_core.globals import set_llm_cache
+    if backend == "memory":
+        from langchain_core.caches import InMemoryCache
+        set_llm_cache(InMemoryCache())
+    elif backend == "sqlite":
+        from langchain_community.cache import SQLiteCache
+        set_llm_cache(SQLiteCache(database_path=os.getenv("LLM_CACHE_DB", ".langgraph_cache.db")))
+    else:
+        raise ValueError(f"Unknown LLM_CACHE: {backend}")
+    logger.info("LLM response cache enabled (%s)", backend)
+
+
+class LLMBatcher:
+    """
+    Coalesce concurrent calls to one chat model into llm.abatch requests.
+    
+    Calls arriving within window seconds of each other (up to max_batch) are
+    dispatched together; a lone call is sent with ainvoke. For OpenAI chat
+    models abatch still makes one HTTP request per call, so batching alone
+    saves no requests and adds up to window of latency. With rpm set,
+    batches are held back so request starts average at most rpm per minute,
+    which is what keeps bursts under a provider's rate limit.
+    
+    Each batch runs as its own task, so a slow batch never delays the next
+    one. The worker belongs to the event loop it was started on and is
+    replaced when called from another.
+    """
+    
+    def __init__(
+        self,
+        llm: Any,
+        window: float = 0.02,
+        max_batch: int = 8,
+        rpm: Optional[float] = None
+    ):
+        self.llm = llm
+        self.window = window
+        self.max_batch = max_batch
+        # Minimum spacing between request starts, and the next free start time
+        self._interval = 60.0 / rpm if rpm else 0.0
+        self._next_slot = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # In-flight batch tasks (the loop only keeps weak references)
+        self._batches: set = set()
+    
+    async def ainvoke(self, messages: List[Any], config: Optional[RunnableConfig] = None) -> Any:
+        """Queue one call and wait for its result."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._batches = set()
+            self._next_slot = 0.0
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        await self._queue.put((messages, config, future))
+        return await future
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            task = loop.create_task(self._dispatch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+    
+    async def _throttle(self, count: int) -> None:
+        """Reserve start slots for count requests and wait for the last one."""
+        if not self._interval:
+            return
+        loop = asyncio.get_running_loop()
+        start = max(self._next_slot, loop.time())
+        self._next_slot = start + count * self._interval
+        delay = start + (count - 1) * self._interval - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    async def _dispatch(self, batch: List[Tuple[Any, Any, asyncio.Future]]) -> None:
+        """Send one batch and resolve its callers' futures."""
+        inputs = [messages for messages, _, _ in batch]
+        configs = [config or {} for _, config, _ in batch]
+        try:
+            await self._throttle(len(batch))
+            if len(batch) == 1:
+                results = [await self.llm.ainvoke(inputs[0], configs[0])]
+            else:
+                results = await self.llm.abatch(
+                    inputs, configs, return_exceptions=True
+                )
+        except Exception as e:
+            results = [e] * len(batch)
+        
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def create_checkpointer(backend: Optional[str] = None) -> BaseCheckpointSaver:
+    """
+    Create the graph checkpointer selected by CHECKPOINT_BACKEND.
+    
+    Supported backends are "memory" (default, development only; keeps the
+    CHECKPOINT_MAX_THREADS most recently written threads), "sqlite"
+    (CHECKPOINT_DB, defaults to checkpoints.db) and "postgres" (CHECKPOINT_DB_URI).
+    The persistent backends are async savers and need LangGraphAgent.ainit.
+    """
+    backend = (backend or os.getenv("CHECKPOINT_BACKEND", "memory")).lower()
+    if backend == "sqlite":
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        return AsyncSqliteSaver(aiosqlite.connect(os.getenv("CHECKPOINT_DB", "checkpoints.db")))
+    if backend == "postgres":
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        pool = AsyncConnectionPool(
+            conninfo=os.environ["CHECKPOINT_DB_URI"],
+            open=False,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row}
+        )
+        return AsyncPostgresSaver(pool)
+    if backend != "memory":
+        raise ValueError(f"Unknown CHECKPOINT_BACKEND: {backend}")
+    from .checkpoint import BoundedMemorySaver
+    return BoundedMemorySaver(max_threads=int(os.getenv("CHECKPOINT_MAX_THREADS", "1000")))
+
+
+# Savers already prepared by prepare_checkpointer
+_PREPARED_CHECKPOINTERS: "weakref.WeakSet[BaseCheckpointSaver]" = weakref.WeakSet()
+_CHECKPOINTER_SETUP_LOCK = asyncio.Lock()
+
+
+async def prepare_checkpointer(checkpointer: BaseCheckpointSaver) -> None:
+    """
+    Open the connections and create the tables of a persistent saver.
+    
+    Runs once per saver; agents sharing a compiled graph share its saver and
+    skip this. The in-memory saver needs no preparation.
+    """
+    backend = type(checkpointer).__name__
+    if backend not in ("AsyncSqliteSaver", "AsyncPostgresSaver"):
+        return
+    async with _CHECKPOINTER_SETUP_LOCK:
+        if checkpointer in _PREPARED_CHECKPOINTERS:
+            return
+        if backend == "AsyncPostgresSaver":
+            from psycopg_pool import AsyncConnectionPool
+            # create_checkpointer builds its pool closed (open=False)
+            if isinstance(checkpointer.conn, AsyncConnectionPool) and checkpointer.conn.closed:
+                await checkpointer.conn.open()
+        await checkpointer.setup()
+        if backend == "AsyncSqliteSaver":
+            # setup() switches the database to WAL; in WAL mode NORMAL sync
+            # stays corruption-safe and skips an fsync per commit
+            await checkpointer.conn.execute("PRAGMA synchronous=NORMAL")
+        _PREPARED_CHECKPOINTERS.add(checkpointer)
+
+
 class LangGraphAgent:
     """
     LangGraph-based AI Agent with tool integration and LangSmith tracing.
     """
     
+    # Compiled graphs shared by agents with the same configuration, and the
+    # uncompiled workflows behind them (reused with dedicated checkpointers)
+    _GRAPH_CACHE: Dict[tuple, Any] = {}
+    _WORKFLOW_CACHE: Dict[tuple, StateGraph] = {}
+    
     def __init__(
         self,
         model: str = "gpt-3.5-turbo",
@@ -44,116 +419,203 @@ class LangGraphAgent:
         max_iterations: int = 10,
         tools: Optional[List[Any]] = None,
         system_prompt: Optional[str] = None,
-        enable_tracing: bool = True
+        enable_tracing: bool = True,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        enable_response_cache: bool = False,
+        semantic_cache: Optional["SemanticResponseCache"] = None
     ):
+        self._init_settings(
+            model, temperature, max_iterations, system_prompt, enable_tracing,
+            checkpointer, enable_response_cache, semantic_cache
+        )
+        if tools is None:
+            raise ValueError("Tools must be provided to __init__. Use LangGraphAgent.ainit for async tool loading.")
+        self._finalize_init(tools)
+        logger.info("Initialized LangGraph Agent with model: %s", model)
+    
+    def _init_settings(
+        self,
+        model: str,
+        temperature: float,
+        max_iterations: int,
+        system_prompt: Optional[str],
+        enable_tracing: bool,
+        checkpointer: Optional[BaseCheckpointSaver],
+        enable_response_cache: bool,
+        semantic_cache: Optional["SemanticResponseCache"]
+    ) -> None:
+        """Store the constructor settings shared by __init__ and ainit."""
         self.model = model
         self.temperature = temperature
         self.max_iterations = max_iterations
         self.enable_tracing = enable_tracing
+        self.enable_response_cache = enable_response_cache
+        self.semantic_cache = semantic_cache
+        # Only agents on the default checkpointer may share a compiled graph;
+        # theirs is created (or taken from the shared graph) in _create_graph
+        self._share_graph = checkpointer is None
+        self.checkpointer = checkpointer
         self.system_prompt = system_prompt or self._get_default_system_prompt()
-        if tools is None:
-            raise ValueError("Tools must be provided to __init__. Use LangGraphAgent.ainit for async tool loading.")
+    
+    def _finalize_init(self, tools: List[Any]) -> None:
+        """Attach the tools, then build the prompt, chat model and graph."""
         self.tools = tools
+        # Tools never change after init, so resolve their names once
+        self._tool_names = tuple(tool.name for tool in self.tools)
         # Log loaded tool names
-        logger.info(f"Loaded MCP tools: {[tool.name for tool in self.tools]}")
+        logger.info("Loaded MCP tools: %s", self._tool_names)
         # Dynamically append tool names and descriptions to system prompt
-        tool_info = [
-            f"{tool.name}: {getattr(tool, 'description', 'No description')}"
+        self.system_prompt = _compose_system_prompt(self.system_prompt, tuple(
+            (tool.name, getattr(tool, 'description', 'No description'))
             for tool in self.tools
-        ]
-        tool_info_str = "\n".join(tool_info)
-        self.system_prompt += (
-            f"\n\nYou have access to the following MCP tools:\n{tool_info_str}\n"
-            "When asked about your capabilities, list these tools and their descriptions."
-        )
-        # LLM selection logic
-        if model.lower().startswith("deepseek"):
-            if ChatDeepSeek is None:
-                raise ImportError("langchain-deepseek is not installed. Please install it to use DeepSeek models.")
-            self.llm = ChatDeepSeek(
-                model=model,
-                temperature=temperature
-            )
-            # Optionally bind tools if supported
-            if hasattr(self.llm, 'bind_tools'):
-                self.llm = self.llm.bind_tools(self.tools)
-        else:
-            self.llm = ChatOpenAI(
-                model=model,
-                temperature=temperature
-            ).bind_tools(self.tools)
+        ))
+        configure_llm_cache()
+        # Agents with the same model settings and tools share one chat model
+        self.llm = get_chat_model(self.model, self.temperature, self.tools)
         self.graph = self._create_graph()
-        logger.info(f"Initialized LangGraph Agent with model: {model}")
     
     def _get_default_system_prompt(self) -> str:
         """Get the default system prompt for the agent from a file."""
-        prompt_path = os.path.join(os.path.dirname(__file__), 'prompt', 'system_prompt.txt')
-        try:
-            with open(prompt_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            # Fallback to a minimal prompt if file is missing or unreadable
-            logger.warning(f"Could not load system prompt from {prompt_path}: {e}")
-            return "You are an AI assistant. Use tools to help the user."
+        return _load_default_prompt(_SYSTEM_PROMPT_PATH)
 
     async def _load_mcp_tools(self):
         # Load ONLY sequential thinking from MCP (reliable tool)
         # Load custom tools directly for file operations (more reliable)
-        
-        config_path = os.path.join(os.path.dirname(__file__), 'tools', 'mcp.json')
-        
-        # Load sequential thinking from MCP
+
+        # Import the custom tools in a worker thread while the MCP servers
+        # start up; the toolkit imports are the slow part of this method
+        custom_tools_task = asyncio.create_task(asyncio.to_thread(_import_custom_tools))
+
+        # Load MCP tools (once per process; later agents reuse the clients
+        # and their tools instead of re-spawning the servers)
+        global _MCP_TOOLS
         mcp_tools = []
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                mcp_config = json.load(f)
-            
-            # Only load sequential thinking MCP server
-            sequential_thinking_config = {
-                "sequential-thinking": mcp_config.get('mcpServers', {}).get('sequential-thinking')
-            }
-            
-            if sequential_thinking_config["sequential-thinking"]:
-                from langchain_mcp_adapters.client import MultiServerMCPClient
-                client = MultiServerMCPClient(sequential_thinking_config)
-                mcp_tools = await client.get_tools()
-                logger.info(f"Loaded MCP sequential thinking tools: {[tool.name for tool in mcp_tools]}")
-            else:
-                logger.warning("Sequential thinking MCP server not found in config")
-                
+            async with _MCP_TOOLS_LOCK:
+                if _MCP_TOOLS is None:
+                    mcp_servers = _load_mcp_config(_MCP_CONFIG_PATH).get('mcpServers', {})
+                    servers = {
+                        name: mcp_servers[name]
+                        for name in _MCP_ENABLED_SERVERS
+                        if mcp_servers.get(name)
+                    }
+
+                    if servers:
+                        from langchain_mcp_adapters.client import MultiServerMCPClient
+                        # One client per server so their handshakes run concurrently
+                        clients = {name: MultiServerMCPClient({name: cfg}) for name, cfg in servers.items()}
+                        results = await asyncio.gather(
+                            *(client.get_tools() for client in clients.values()),
+                            return_exceptions=True
+                        )
+                        loaded = []
+                        for (name, client), result in zip(clients.items(), results):
+                            if isinstance(result, BaseException):
+                                logger.error("Error loading MCP server %s: %s", name, result)
+                                continue
+                            _MCP_CLIENTS.append(client)
+                            loaded.extend(result)
+                        _MCP_TOOLS = loaded
+                        logger.info("Loaded MCP tools: %s", [tool.name for tool in _MCP_TOOLS])
+                    else:
+                        logger.warning("Sequential thinking MCP server not found in config")
+                        _MCP_TOOLS = []
+                mcp_tools = _MCP_TOOLS
+
         except Exception as e:
-            logger.error(f"Error loading MCP tools: {e}")
+            # Not cached, so the next agent retries
+            logger.error("Error loading MCP tools: %s", e)
             # Continue with custom tools only if MCP fails
-        
+
         # Load custom tools
         custom_tools = []
         try:
-            from .tools import CUSTOM_TOOLS
-            custom_tools = CUSTOM_TOOLS
-            logger.info(f"Loaded custom tools: {[tool.name for tool in custom_tools]}")
+            custom_tools = await custom_tools_task
+            logger.info("Loaded custom tools: %s", [tool.name for tool in custom_tools])
         except Exception as e:
-            logger.error(f"Error loading custom tools: {e}")
-            
-        # Combine MCP sequential thinking + custom tools  
+            logger.error("Error loading custom tools: %s", e)
+
+        # Combine MCP sequential thinking + custom tools
         all_tools = mcp_tools + custom_tools
-        
+
         if not all_tools:
             logger.warning("No tools loaded! Agent will not be able to perform actions.")
-            
+
         return all_tools
 
     def _create_graph(self):
-        """Create the LangGraph workflow."""
+        """Create the LangGraph workflow, reusing a compiled one when possible."""
+        # The nodes are methods of the agent that built the workflow, so the
+        # key covers everything they read: settings, prompt, and the very
+        # tool and chat model objects (kept alive by the cache, so their ids
+        # stay unique). The batcher is derived from the model and env.
+        workflow_key = (
+            self.model,
+            self.temperature,
+            self.max_iterations,
+            tuple(id(tool) for tool in self.tools),
+            id(self.llm),
+            hash(self.system_prompt),
+            os.getenv("AGENT_NODE_CACHE_TTL"),
+            os.getenv("LLM_BATCH_WINDOW_MS"),
+            os.getenv("LLM_BATCH_SIZE"),
+            os.getenv("LLM_RATE_LIMIT_RPM")
+        )
+        if not self._share_graph:
+            # A dedicated checkpointer still reuses the graph structure
+            return self._compile(self._get_workflow(workflow_key))
+        
+        backend = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+        key = workflow_key + (backend,)
+        app = LangGraphAgent._GRAPH_CACHE.get(key)
+        if app is None:
+            self.checkpointer = create_checkpointer()
+            app = LangGraphAgent._GRAPH_CACHE[key] = self._compile(self._get_workflow(workflow_key))
+        elif backend == "memory":
+            # An in-memory saver is the agent's private history (the default
+            # thread id is per user, not per agent), so each agent gets its
+            # own on a copy of the compiled graph
+            self.checkpointer = create_checkpointer()
+            app = app.copy({"checkpointer": self.checkpointer})
+        else:
+            # Persistent backends are one shared store anyway; reuse the
+            # saver rather than open more connections to it
+            self.checkpointer = app.checkpointer
+        return app
+    
+    def _get_workflow(self, workflow_key: tuple) -> StateGraph:
+        """
+        Return the uncompiled workflow for this configuration, building it once.
         
-        # Create tool node
-        tool_node = ToolNode(self.tools)
+        The nodes are bound to the agent that built the workflow; agents with
+        the same key are configured identically, so any of them can serve.
+        """
+        workflow = LangGraphAgent._WORKFLOW_CACHE.get(workflow_key)
+        if workflow is None:
+            workflow = LangGraphAgent._WORKFLOW_CACHE[workflow_key] = self._build_workflow()
+        return workflow
+    
+    def _build_workflow(self) -> StateGraph:
+        """Build the LangGraph workflow (nodes and edges, not yet compiled)."""
+        
+        # Create tool node (wrapped so tool outcomes are recorded in state)
+        from langgraph.prebuilt import ToolNode
+        self._tool_node = ToolNode(self.tools)
         
         # Create state graph
         workflow = StateGraph(AgentState)
         
+        # Optionally memoize the agent node so replays/retries of an identical
+        # state skip the LLM round-trip. Tools are never cached (side effects).
+        agent_node_kwargs = {}
+        cache_ttl = os.getenv("AGENT_NODE_CACHE_TTL")
+        if cache_ttl:
+            from langgraph.types import CachePolicy
+            agent_node_kwargs["cache_policy"] = CachePolicy(ttl=int(cache_ttl))
+        
         # Add nodes
-        workflow.add_node("agent", self._agent_node)
-        workflow.add_node("tools", tool_node)
+        workflow.add_node("agent", self._agent_node, **agent_node_kwargs)
+        workflow.add_node("tools", self._tools_node)
         
         # Set entry point
         workflow.set_entry_point("agent")
@@ -171,112 +633,189 @@ class LangGraphAgent:
         # Add edge from tools back to agent
         workflow.add_edge("tools", "agent")
         
-        # Compile with memory
-        memory = MemorySaver()
-        app = workflow.compile(checkpointer=memory)
-        
-        return app
+        return workflow
+    
+    def _compile(self, workflow: StateGraph):
+        """Compile the workflow with this agent's checkpointer."""
+        if not os.getenv("AGENT_NODE_CACHE_TTL"):
+            # compile() only accepts cache= on langgraph releases with node caching
+            return workflow.compile(checkpointer=self.checkpointer)
+        from .node_cache import SuccessOnlyCache
+        return workflow.compile(checkpointer=self.checkpointer, cache=SuccessOnlyCache())
     
-    def _agent_node(self, state):
+    @cached_property
+    def _llm_batcher(self) -> Optional[LLMBatcher]:
+        """
+        Micro-batcher for agent LLM calls, enabled by LLM_BATCH_WINDOW_MS
+        and/or LLM_RATE_LIMIT_RPM (without a window, calls go out one by one).
+        """
+        window_ms = os.getenv("LLM_BATCH_WINDOW_MS")
+        rpm = os.getenv("LLM_RATE_LIMIT_RPM")
+        if not window_ms and not rpm:
+            return None
+        return LLMBatcher(
+            self.llm,
+            window=float(window_ms or 0) / 1000,
+            max_batch=int(os.getenv("LLM_BATCH_SIZE", "8")),
+            rpm=float(rpm) if rpm else None
+        )
+    
+    async def _agent_node(self, state, config: RunnableConfig):
         """
         Agent reasoning node - processes messages and decides on actions.
         """
         try:
-            # Get messages from state
-            messages = state.get("messages", [])
+            # create_initial_state seeds every key read here, and the
+            # add_messages reducer keeps messages a list
+            messages = state["messages"]
             
-            # Convert to list if needed
-            if not isinstance(messages, list):
-                messages = []
-            
-            # Add system message if this is the first interaction
-            if not messages or not any(isinstance(msg, SystemMessage) for msg in messages):
-                system_message = SystemMessage(content=self.system_prompt)
-                messages = [system_message] + messages
-            
-            # Add user context to the conversation
-            user_context = state.get("user_context", {})
-            context_info = f"""
-Current Context:
-- Working Directory: {user_context.get('working_directory', 'Unknown')}
-- User: {user_context.get('name', 'User')}
-- Session: {user_context.get('session_id', 'Unknown')}
-- Iteration: {state.get('iteration_count', 0)}
-"""
-            
-            # Add context as a system message for this turn
-            context_message = SystemMessage(content=context_info)
-            messages_with_context = messages + [context_message]
+            # The session's static context (per-run values from
+            # RunnableConfig.configurable) is folded into a cached system
+            # message. It is never written back to the checkpointed state, so
+            # no scan or has_system flag is needed. The chat API is stateless, so
+            # the system message is sent on every call; keeping it byte-identical
+            # lets the provider's prefix cache serve it. Only the iteration
+            # counter changes per turn: it goes last, and only once a tool round
+            # has happened (on the first call it carries no information).
+            configurable = (config or {}).get("configurable", {})
+            user_context = state["user_context"]
+            system_message = _session_system_message(
+                self.system_prompt,
+                configurable.get('working_directory', user_context.get('working_directory', 'Unknown')),
+                configurable.get('user_name', user_context.get('name', 'User')),
+                configurable.get('session_id', user_context.get('session_id', 'Unknown'))
+            )
+            iteration = state["iteration_count"]
+            if iteration:
+                messages_with_context = [system_message, *messages, _iteration_message(iteration)]
+            else:
+                messages_with_context = [system_message, *messages]
             
-            # Call LLM
-            response = self.llm.invoke(messages_with_context)
+            # Call LLM (coalesced with concurrent runs when batching is on)
+            if self._llm_batcher is not None:
+                response = await self._llm_batcher.ainvoke(messages_with_context, config)
+            else:
+                response = await self.llm.ainvoke(messages_with_context)
             
             # Update iteration count
-            new_iteration = state.get("iteration_count", 0) + 1
-            
-            # Track tool call results for better error handling
-            tool_results = []
-            if hasattr(response, 'tool_calls') and response.tool_calls:
-                for tool_call in response.tool_calls:
-                    tool_results.append({
-                        'tool_name': tool_call.get('name', 'unknown'),
-                        'attempted_at': datetime.now().isoformat(),
-                        'tool_call_id': tool_call.get('id')
-                    })
+            new_iteration = iteration + 1
             
             return {
                 "messages": [response],
-                "iteration_count": new_iteration,
-                "tool_results": tool_results
+                "iteration_count": new_iteration
             }
             
         except Exception as e:
-            logger.error(f"Error in agent node: {e}")
-            error_message = AIMessage(
-                content=f"""I encountered an error while processing your request: {str(e)}
-
-**Troubleshooting Tips:**
-1. If this is a file edit error, the issue might be with HTML formatting differences
-2. Try being more specific about the content to change
-3. Some edits may have succeeded partially - check the output files
-
-Please try again or rephrase your request."""
-            )
+            logger.error("Error in agent node: %s", e)
+            error_text = str(e)
+            error_message = AIMessage(content=_AGENT_ERROR_TEMPLATE.format(error_text))
             return {
                 "messages": [error_message],
                 "error_info": {
-                    "message": str(e),
+                    "message": error_text,
                     "type": "agent_error",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": time.time_ns()
                 }
             }
     
+    async def _tools_node(self, state, config: RunnableConfig):
+        """
+        Run the requested tools and emit one tool_results entry per call.
+        
+        ToolNode.ainvoke already executes all tool calls of a turn concurrently
+        (asyncio.gather, sync tools in the executor), so a turn with N I/O-bound
+        calls takes about as long as the slowest one. Only the new entries are
+        returned; the AgentState reducer appends them.
+        """
+        result = await self._tool_node.ainvoke(state, config)
+        completed_at = time.time_ns()
+        # The output itself stays in the ToolMessage, so result is left unset
+        tool_results = [
+            tool_result_entry(
+                message.name or "unknown",
+                success=getattr(message, "status", "success") != "error",
+                tool_call_id=message.tool_call_id,
+                completed_at=completed_at
+            )
+            for message in result["messages"]
+            if isinstance(message, ToolMessage)
+        ]
+        return {"messages": result["messages"], "tool_results": tool_results}
+    
     def _should_continue(self, state) -> Literal["continue", "end"]:
         """
         Determine whether to continue with tool calls or end the conversation.
         """
-        # Get messages safely
-        messages = state.get("messages", [])
-        
-        if not isinstance(messages, list) or not messages:
+        messages = state["messages"]
+        if not messages:
             return "end"
-            
-        last_message = messages[-1]
         
         # Check iteration limit
-        iteration_count = state.get("iteration_count", 0)
-        if iteration_count >= self.max_iterations:
-            logger.warning(f"Reached maximum iterations ({self.max_iterations})")
+        if state["iteration_count"] >= self.max_iterations:
+            logger.warning("Reached maximum iterations (%d)", self.max_iterations)
             return "end"
         
-        # If the last message has tool calls, continue to tools
-        if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-            return "continue"
+        # Continue to tools only if the last message requested tool calls
+        return "continue" if getattr(messages[-1], "tool_calls", None) else "end"
+    
+    async def _response_cache_key(
+        self, user_input: str, working_directory: str, user_name: str, thread_id: str
+    ) -> Optional[str]:
+        """Return the response cache key, or None when caching doesn't apply."""
+        if not self.enable_response_cache or self.temperature > 0.01:
+            return None
+        # The answer depends on the conversation so far, so the key names the
+        # thread's latest checkpoint (ids are unique across threads, and every
+        # recorded turn advances it). Fresh threads share "" and so share
+        # answers to the same opening request.
+        saved = await self.graph.checkpointer.aget_tuple(
+            RunnableConfig(configurable={"thread_id": thread_id})
+        )
+        checkpoint_id = saved.config["configurable"]["checkpoint_id"] if saved else ""
+        raw = "\0".join((
+            self.model,
+            str(self.temperature),
+            self.system_prompt,
+            working_directory,
+            user_name,
+            checkpoint_id,
+            user_input.strip()
+        ))
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _prepare_run(
+        self,
+        user_input: str,
+        user_id: str,
+        session_id: Optional[str],
+        user_name: str,
+        working_directory: str,
+        thread_id: Optional[str]
+    ):
+        """Build the graph config and input state for a single request."""
+        # Create input state
+        input_state = create_initial_state(
+            user_id=user_id,
+            session_id=session_id,
+            user_name=user_name,
+            working_directory=working_directory,
+            available_tools=self._tool_names
+        )
+        input_state["messages"] = [HumanMessage(content=user_input)]
         
-        # Otherwise, end the conversation
-        return "end"
+        # Create configuration; per-run context travels in configurable
+        config = RunnableConfig(configurable={
+            "thread_id": thread_id,
+            "working_directory": working_directory,
+            "user_name": user_name,
+            "session_id": input_state["user_context"]["session_id"]
+        })
+        # Add recursion_limit to config
+        config_dict = dict(config)
+        config_dict["recursion_limit"] = 100
+        return config_dict, input_state
     
-    async def process_request(
+    async def stream_request(
         self,
         user_input: str,
         user_id: str = "default_user",
@@ -284,6 +823,39 @@ Please try again or rephrase your request."""
         user_name: str = "User",
         working_directory: str = ".",
         thread_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Run a user request and yield model output tokens as they are generated.
+        
+        Takes the same arguments as process_request.
+        """
+        thread_id = thread_id or session_id or f"thread_{user_id}"
+        config_dict, input_state = self._prepare_run(
+            user_input, user_id, session_id, user_name, working_directory, thread_id
+        )
+        # Model calls that request tools are intermediate rounds, not the
+        # answer; once a call starts emitting tool calls, its tokens are dropped
+        tool_call_runs = set()
+        async for event in self.graph.astream_events(input_state, config_dict, version="v2"):
+            if event["event"] != "on_chat_model_stream":
+                continue
+            chunk = event["data"]["chunk"]
+            if getattr(chunk, "tool_call_chunks", None):
+                tool_call_runs.add(event["run_id"])
+            if event["run_id"] in tool_call_runs:
+                continue
+            if chunk.content:
+                yield chunk.content
+    
+    async def process_request(
+        self,
+        user_input: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None,
+        user_name: str = "User",
+        working_directory: str = ".",
+        thread_id: Optional[str] = None,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Process a user request through the LangGraph workflow.
@@ -295,35 +867,76 @@ Please try again or rephrase your request."""
             user_name: User's display name
             working_directory: Current working directory
             thread_id: Thread ID for conversation continuity
+            on_token: Optional callback receiving model tokens as they stream
             
         Returns:
             Response dictionary with agent output and metadata
         """
         try:
-            # Create configuration
             thread_id = thread_id or session_id or f"thread_{user_id}"
-            config = RunnableConfig(configurable={"thread_id": thread_id})
-            # Add recursion_limit to config
-            config_dict = dict(config)
-            config_dict["recursion_limit"] = 100
             
-            # Create input state
-            input_state = create_initial_state(
-                user_id=user_id,
-                session_id=session_id,
-                user_name=user_name,
-                working_directory=working_directory,
-                available_tools=[tool.name for tool in self.tools]
+            # Short-circuit repeated idempotent queries
+            cache_key = await self._response_cache_key(
+                user_input, working_directory, user_name, thread_id
             )
-            input_state["messages"] = [HumanMessage(content=user_input)]
+            if cache_key is not None and cache_key in _RESPONSE_CACHE:
+                _RESPONSE_CACHE.move_to_end(cache_key)
+                cached = dict(_RESPONSE_CACHE[cache_key])
+                # The graph is skipped, so record the turn in the thread
+                # ourselves (the same state a run would write); later
+                # requests then see it in their history
+                config_dict, input_state = self._prepare_run(
+                    user_input, user_id, session_id, user_name, working_directory, thread_id
+                )
+                input_state["messages"].append(AIMessage(content=cached["response"]))
+                await self.graph.aupdate_state(config_dict, input_state, as_node="agent")
+                cached.update({
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "timestamp": datetime.now().isoformat(),
+                    "cached": True
+                })
+                return cached
             
-            # Run the graph with increased recursion limit
-            result = await self.graph.ainvoke(input_state, config_dict)
+            # Paraphrases of an earlier request in this thread reuse its answer
+            embedding = None
+            if self.semantic_cache is not None:
+                embedding = await self.semantic_cache.aembed(user_input)
+                similar = self.semantic_cache.lookup(thread_id, embedding)
+                if similar is not None:
+                    cached = dict(similar)
+                    cached.update({
+                        "user_id": user_id,
+                        "session_id": session_id,
+                        "timestamp": datetime.now().isoformat(),
+                        "cached": True
+                    })
+                    return cached
+            
+            if on_token is None:
+                config_dict, input_state = self._prepare_run(
+                    user_input, user_id, session_id, user_name, working_directory, thread_id
+                )
+                # Run the graph with increased recursion limit
+                result = await self.graph.ainvoke(input_state, config_dict)
+            else:
+                # Stream tokens to the caller, then read the final state back
+                async for token in self.stream_request(
+                    user_input,
+                    user_id=user_id,
+                    session_id=session_id,
+                    user_name=user_name,
+                    working_directory=working_directory,
+                    thread_id=thread_id
+                ):
+                    on_token(token)
+                snapshot = await self.graph.aget_state(
+                    RunnableConfig(configurable={"thread_id": thread_id})
+                )
+                result = snapshot.values
             
             # Extract the final response
-            messages = result.get("messages", [])
-            if not isinstance(messages, list):
-                messages = []
+            messages = result["messages"]
             
             final_message = messages[-1] if messages else None
             
@@ -332,6 +945,16 @@ Please try again or rephrase your request."""
             else:
                 final_output = "I apologize, but I couldn't generate a proper response."
             
+            # State timestamps are epoch-ns; render them only for the response
+            error_info = result.get("error_info")
+            if error_info and isinstance(error_info.get("timestamp"), int):
+                error_info = {**error_info, "timestamp": format_timestamp(error_info["timestamp"])}
+            tool_results = [
+                {**entry, "completed_at": format_timestamp(entry["completed_at"])}
+                if isinstance(entry.get("completed_at"), int) else entry
+                for entry in result.get("tool_results") or ()
+            ]
+            
             # Prepare response
             response = {
                 "response": final_output,
@@ -341,8 +964,8 @@ Please try again or rephrase your request."""
                 "timestamp": datetime.now().isoformat(),
                 "model_used": self.model,
                 "iteration_count": result.get("iteration_count", 0),
-                "tool_results": result.get("tool_results", []),
-                "error_info": result.get("error_info"),
+                "tool_results": tool_results,
+                "error_info": error_info,
                 "context": {
                     "working_directory": working_directory,
                     "user_name": user_name,
@@ -350,31 +973,49 @@ Please try again or rephrase your request."""
                 }
             }
             
-            logger.info(f"Successfully processed request for {user_id}")
+            # Only answers that ran no tools are safe to replay: a cached reply
+            # to a request that edits files would skip the edit
+            replayable = not response["tool_results"] and not error_info
+            if cache_key is not None and replayable:
+                _RESPONSE_CACHE[cache_key] = response
+                if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAXSIZE:
+                    _RESPONSE_CACHE.popitem(last=False)
+            
+            if embedding is not None and replayable:
+                self.semantic_cache.add(thread_id, embedding, response)
+            
+            logger.info("Successfully processed request for %s", user_id)
             return response
             
         except Exception as e:
-            logger.error(f"Error processing request: {e}")
+            logger.error("Error processing request: %s", e)
+            error_text = str(e)
             return {
-                "response": f"I encountered an error while processing your request: {str(e)}",
+                "response": _REQUEST_ERROR_PREFIX + error_text,
                 "success": False,
-                "error": str(e),
+                "error": error_text,
                 "timestamp": datetime.now().isoformat(),
                 "user_id": user_id,
                 "session_id": session_id
             }
     
-    def get_agent_info(self) -> Dict[str, Any]:
-        """Get information about the agent configuration."""
+    @cached_property
+    def _agent_info(self) -> Dict[str, Any]:
+        """Agent configuration summary; none of these fields change after init."""
         return {
             "model": self.model,
             "temperature": self.temperature,
             "max_iterations": self.max_iterations,
             "num_tools": len(self.tools),
-            "tool_names": [tool.name for tool in self.tools],
+            "tool_names": list(self._tool_names),
             "tracing_enabled": self.enable_tracing,
             "system_prompt_length": len(self.system_prompt)
-        } 
+        }
+    
+    def get_agent_info(self) -> Dict[str, Any]:
+        """Get information about the agent configuration."""
+        # Shallow copy so callers cannot alter the cached summary
+        return dict(self._agent_info)
 
     @classmethod
     async def ainit(
@@ -384,45 +1025,19 @@ Please try again or rephrase your request."""
         max_iterations: int = 10,
         tools: Optional[List[Any]] = None,
         system_prompt: Optional[str] = None,
-        enable_tracing: bool = True
+        enable_tracing: bool = True,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        enable_response_cache: bool = False,
+        semantic_cache: Optional["SemanticResponseCache"] = None
     ):
         self = cls.__new__(cls)
-        self.model = model
-        self.temperature = temperature
-        self.max_iterations = max_iterations
-        self.enable_tracing = enable_tracing
-        self.system_prompt = system_prompt or self._get_default_system_prompt()
-        if tools is not None:
-            self.tools = tools
-        else:
-            self.tools = await self._load_mcp_tools()
-        # Log loaded tool names
-        logger.info(f"Loaded MCP tools: {[tool.name for tool in self.tools]}")
-        # Dynamically append tool names and descriptions to system prompt
-        tool_info = [
-            f"{tool.name}: {getattr(tool, 'description', 'No description')}"
-            for tool in self.tools
-        ]
-        tool_info_str = "\n".join(tool_info)
-        self.system_prompt += (
-            f"\n\nYou have access to the following MCP tools:\n{tool_info_str}\n"
-            "When asked about your capabilities, list these tools and their descriptions."
+        self._init_settings(
+            model, temperature, max_iterations, system_prompt, enable_tracing,
+            checkpointer, enable_response_cache, semantic_cache
         )
-        # LLM selection logic
-        if model.lower().startswith("deepseek"):
-            if ChatDeepSeek is None:
-                raise ImportError("langchain-deepseek is not installed. Please install it to use DeepSeek models.")
-            self.llm = ChatDeepSeek(
-                model=model,
-                temperature=temperature
-            )
-            if hasattr(self.llm, 'bind_tools'):
-                self.llm = self.llm.bind_tools(self.tools)
-        else:
-            self.llm = ChatOpenAI(
-                model=model,
-                temperature=temperature
-            ).bind_tools(self.tools)
-        self.graph = self._create_graph()
-        logger.info(f"Initialized LangGraph Agent with model: {model}")
+        if tools is None:
+            tools = await self._load_mcp_tools()
+        self._finalize_init(tools)
+        await prepare_checkpointer(self.checkpointer)
+        logger.info("Initialized LangGraph Agent with model: %s", model)
         return self 
\ No newline at end of file
@@ -8,8 +8,10 @@ import logging
 from pathlib import Path
 from dotenv import load_dotenv
 
-from .runner import LangGraphRunner
-from .core import LangGraphAgent
+try:
+    import uvloop
+except ImportError:  # optional, and not available on Windows
+    uvloop = None
 
 # Load environment variables
 load_dotenv()
@@ -50,6 +52,10 @@ async def main():
     temperature = float(os.getenv("AGENT_TEMPERATURE", "0.1"))
     max_iterations = int(os.getenv("AGENT_MAX_ITERATIONS", "10"))
     
+    # Import the agent stack only once the configuration checks have passed
+    from .runner import LangGraphRunner
+    from .core import LangGraphAgent, close_shared_http_clients
+    
     print(f"🚀 Starting LangGraph Agent System...")
     print(f"Model: {model} | Temperature: {temperature} | Max Iterations: {max_iterations}")
     
@@ -78,9 +84,18 @@ async def main():
     except KeyboardInterrupt:
         print("\n👋 Session terminated by user")
     except Exception as e:
-        logger.error(f"Error in main: {e}")
+        logger.error("Error in main: %s", e)
         print(f"❌ Error: {str(e)}")
+    finally:
+        await close_shared_http_clients()
+
+
+def run():
+    """Run main() on uvloop when it is installed, else on the default loop."""
+    if uvloop is not None:
+        return uvloop.run(main())
+    return asyncio.run(main())
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run()
@@ -0,0 +1,31 @@
+"""
+Node cache for the LangGraph Agent System
+In-memory node cache that keeps only successful agent-node results
+"""
+
+from typing import Any, Dict, Mapping
+
+from langgraph.cache.memory import InMemoryCache
+
+
+class SuccessOnlyCache(InMemoryCache):
+    """
+    Node cache that never stores a failed run.
+
+    The agent node turns exceptions into an error reply plus an error_info
+    write; caching those would replay the error for the whole TTL.
+    """
+
+    @staticmethod
+    def _successful(pairs: Mapping[Any, Any]) -> Dict[Any, Any]:
+        return {
+            key: (writes, ttl)
+            for key, (writes, ttl) in pairs.items()
+            if not any(channel == "error_info" and value for channel, value in writes)
+        }
+
+    def set(self, pairs: Mapping[Any, Any]) -> None:
+        super().set(self._successful(pairs))
+
+    async def aset(self, pairs: Mapping[Any, Any]) -> None:
+        self.set(pairs)
@@ -3,8 +3,11 @@ LangGraph Agent Runner
 Interactive session management for the LangGraph agent system
 """
 
+import os
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, Deque, List
 from datetime import datetime
 import uuid
 
@@ -44,9 +47,11 @@ class LangGraphRunner:
         )
         self.enable_memory = enable_memory
         
-        # Session management
-        self.active_sessions: Dict[str, Dict[str, Any]] = {}
-        self.conversation_history: Dict[str, List[Dict[str, Any]]] = {}
+        # Session management (bounded so long-lived processes don't grow forever)
+        self.history_maxlen = int(os.getenv("HISTORY_MAXLEN", "500"))
+        self.max_sessions = int(os.getenv("MAX_SESSIONS", "100"))
+        self.active_sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.conversation_history: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
         
         logger.info("LangGraph Runner initialized with memory support")
     
@@ -79,8 +84,8 @@ class LangGraphRunner:
             "interaction_count": 0
         }
         
-        self.active_sessions[session_id] = session_data
-        self.conversation_history[session_id] = []
+        self._open_session(session_id, session_data)
+        self._new_history(session_id)
         
         print(f"🤖 LangGraph Agent System - Interactive Session with Memory")
         print("=" * 60)
@@ -95,8 +100,8 @@ class LangGraphRunner:
         try:
             while True:
                 try:
-                    # Get user input
-                    user_input = input(f"🧑 {user_name}: ").strip()
+                    # Get user input without blocking the event loop
+                    user_input = (await asyncio.to_thread(input, f"🧑 {user_name}: ")).strip()
                     
                     if not user_input:
                         continue
@@ -122,20 +127,30 @@ class LangGraphRunner:
                         self._show_agent_info()
                         continue
                     
-                    # Process the request
+                    # Process the request, streaming tokens as they arrive
                     print(f"\n🔄 Processing: {user_input}")
+                    print("\n🤖 Agent: ", end="", flush=True)
+                    streamed = []
+                    
+                    def _print_token(token: str) -> None:
+                        streamed.append(token)
+                        print(token, end="", flush=True)
                     
                     response = await self.agent.process_request(
                         user_input=user_input,
                         user_id=user_id,
                         user_name=user_name,
                         working_directory=working_directory,
-                        thread_id=thread_id
+                        thread_id=thread_id,
+                        on_token=_print_token
                     )
+                    print()
                     
                     # Display response
                     if response.get("success", False):
-                        print(f"\n🤖 Agent: {response['response']}")
+                        # Only print the final answer if nothing was streamed
+                        if not streamed:
+                            print(response['response'])
                         
                         # Update session data
                         session_data["interaction_count"] += 1
@@ -180,7 +195,7 @@ class LangGraphRunner:
                 
                 except Exception as e:
                     print(f"\n❌ Unexpected error: {str(e)}")
-                    logger.error(f"Error in interactive session: {e}")
+                    logger.error("Error in interactive session: %s", e)
                     continue
         
         finally:
@@ -189,7 +204,20 @@ class LangGraphRunner:
                 del self.active_sessions[session_id]
             
             # Keep conversation history for potential review
-            logger.info(f"Interactive session ended for {user_id}")
+            logger.info("Interactive session ended for %s", user_id)
+    
+    def _open_session(self, session_id: str, session_data: Dict[str, Any]) -> None:
+        """Register an active session, evicting the oldest beyond max_sessions."""
+        self.active_sessions[session_id] = session_data
+        while len(self.active_sessions) > self.max_sessions:
+            self.active_sessions.popitem(last=False)
+    
+    def _new_history(self, session_id: str) -> None:
+        """Start a bounded history for a session, evicting the oldest sessions."""
+        self.conversation_history[session_id] = deque(maxlen=self.history_maxlen)
+        self.conversation_history.move_to_end(session_id)
+        while len(self.conversation_history) > self.max_sessions:
+            self.conversation_history.popitem(last=False)
     
     def _show_help(self) -> None:
         """Show help information."""
@@ -220,6 +248,7 @@ Tips:
             print("No conversation history available.")
             return
         
+        self.conversation_history.move_to_end(session_id)
         history = self.conversation_history[session_id]
         if not history:
             print("No conversation history available.")
@@ -244,7 +273,7 @@ Tips:
     def _clear_history(self, session_id: str) -> None:
         """Clear conversation history for a session."""
         if session_id in self.conversation_history:
-            self.conversation_history[session_id] = []
+            self.conversation_history[session_id].clear()
             print("✅ Conversation history cleared.")
         else:
             print("No conversation history to clear.")
@@ -298,4 +327,40 @@ Tips:
             user_name=user_name,
             working_directory=working_directory,
             session_id=session_id
-        ) 
\ No newline at end of file
+        )
+    
+    async def process_batch(
+        self,
+        inputs: List[Dict[str, Any]],
+        max_concurrency: int = 10
+    ) -> List[Any]:
+        """
+        Process several independent requests concurrently.
+        
+        Items without a session_id get a fresh one, so each runs on its own
+        checkpoint thread. Items that share a session_id run one after another
+        in input order, since they write to the same thread.
+        
+        Args:
+            inputs: List of keyword-argument dicts for process_single_request
+            max_concurrency: Maximum number of requests in flight at once
+            
+        Returns:
+            List of response dictionaries (or exceptions), in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        session_locks: Dict[str, asyncio.Lock] = {}
+        
+        async def _one(request_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+            request_kwargs = dict(request_kwargs)
+            if not request_kwargs.get("session_id"):
+                request_kwargs["session_id"] = str(uuid.uuid4())
+            lock = session_locks.setdefault(request_kwargs["session_id"], asyncio.Lock())
+            async with lock:
+                async with semaphore:
+                    return await self.process_single_request(**request_kwargs)
+        
+        return await asyncio.gather(
+            *[_one(request_kwargs) for request_kwargs in inputs],
+            return_exceptions=True
+        )
@@ -0,0 +1,71 @@
+"""
+Semantic response cache for the LangGraph Agent System
+Reuses a stored response when a new request is a paraphrase of an earlier one
+"""
+
+import math
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+Embedding = Tuple[float, ...]
+
+
+def _normalize(vector: List[float]) -> Embedding:
+    """Scale a vector to unit length so cosine similarity is a dot product."""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return tuple(x / norm for x in vector)
+
+
+class SemanticResponseCache:
+    """
+    Nearest-neighbour cache of agent responses keyed by input embeddings.
+
+    Entries are partitioned into namespaces (the conversation thread), so one
+    user's answers are never served to another. Each namespace keeps its most
+    recent max_entries responses and is scanned linearly, which is cheap next
+    to the graph run a hit replaces.
+    """
+
+    def __init__(
+        self,
+        embeddings: Optional[Any] = None,
+        threshold: float = 0.92,
+        max_entries: int = 64,
+        max_namespaces: int = 256
+    ):
+        if embeddings is None:
+            from langchain_openai import OpenAIEmbeddings
+            embeddings = OpenAIEmbeddings()
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_namespaces = max_namespaces
+        self._entries: "OrderedDict[str, Deque[Tuple[Embedding, Dict[str, Any]]]]" = OrderedDict()
+
+    async def aembed(self, text: str) -> Embedding:
+        """Embed a user input once; pass the result to lookup() and add()."""
+        return _normalize(await self.embeddings.aembed_query(text.strip()))
+
+    def lookup(self, namespace: str, embedding: Embedding) -> Optional[Dict[str, Any]]:
+        """Return the closest stored response at or above the threshold."""
+        entries = self._entries.get(namespace)
+        if not entries:
+            return None
+        self._entries.move_to_end(namespace)
+        best_score, best_response = self.threshold, None
+        for stored, response in entries:
+            score = sum(a * b for a, b in zip(stored, embedding))
+            if score >= best_score:
+                best_score, best_response = score, response
+        return best_response
+
+    def add(self, namespace: str, embedding: Embedding, response: Dict[str, Any]) -> None:
+        """Store a response for later paraphrases in the same namespace."""
+        entries = self._entries.get(namespace)
+        if entries is None:
+            entries = self._entries[namespace] = deque(maxlen=self.max_entries)
+            if len(self._entries) > self.max_namespaces:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(namespace)
+        entries.append((embedding, response))
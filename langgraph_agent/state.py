@@ -3,8 +3,9 @@ State management for LangGraph Agent System
 Defines the state structure and management for graph-based agent workflows
 """
 
-from typing import Dict, Any, List, Optional, TypedDict
+from typing import Dict, Any, List, Optional, Sequence, TypedDict
 from datetime import datetime
+import time
 import uuid
 
 from langchain_core.messages import BaseMessage
@@ -22,6 +23,23 @@ class UserContext(TypedDict):
     permissions: Dict[str, bool]
 
 
+def add_tool_results(
+    existing: Optional[List[Dict[str, Any]]],
+    new: Optional[List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Reducer that appends tool results; a None update resets them for a new request"""
+    if new is None:
+        return []
+    if not new:
+        return existing or []
+    return [*(existing or ()), *new]
+
+
+def merge_session_info(existing: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer that merges partial session info updates into the current value"""
+    return {**(existing or {}), **new}
+
+
 class AgentState(TypedDict):
     """
     State for LangGraph agent that includes messages and additional context.
@@ -32,9 +50,28 @@ class AgentState(TypedDict):
     
     # Additional state fields
     user_context: UserContext
-    session_info: Dict[str, Any]
+    session_info: Annotated[Dict[str, Any], merge_session_info]
     error_info: Optional[Dict[str, Any]]
     iteration_count: int
+    # Nodes return only new results; the reducer appends them
+    tool_results: Annotated[List[Dict[str, Any]], add_tool_results]
+
+
+def format_timestamp(timestamp_ns: int) -> str:
+    """Render an epoch-nanosecond state timestamp as an ISO 8601 string"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+
+# Constant parts of a fresh state, shallow-copied per request. The nested
+# defaults are shared between states and must be treated as read-only (plain
+# dicts rather than MappingProxyType so the checkpointer can serialize them).
+_DEFAULT_PREFERENCES: Dict[str, Any] = {}
+_DEFAULT_PERMISSIONS: Dict[str, bool] = {}
+_INITIAL_STATE_TEMPLATE: Dict[str, Any] = {
+    "error_info": None,
+    "iteration_count": 0,
+    "tool_results": None
+}
 
 
 def create_initial_state(
@@ -42,54 +79,67 @@ def create_initial_state(
     session_id: Optional[str] = None,
     user_name: str = "User",
     working_directory: str = ".",
-    available_tools: Optional[List[str]] = None
+    available_tools: Optional[Sequence[str]] = None
 ) -> Dict[str, Any]:
     """Create initial state for a new conversation"""
     if not session_id:
         session_id = str(uuid.uuid4())
-    if available_tools is None:
-        available_tools = []
-    return {
-        "messages": [],
-        "user_context": {
-            "user_id": user_id,
-            "session_id": session_id,
-            "name": user_name,
-            "working_directory": working_directory,
-            "available_tools": available_tools
-        },
-        "session_info": {
-            "created_at": datetime.now().isoformat(),
-            "last_updated": datetime.now().isoformat(),
-            "total_interactions": 0
-        },
-        "error_info": None,
-        "iteration_count": 0
+    now = time.time_ns()
+    state = _INITIAL_STATE_TEMPLATE.copy()
+    state["messages"] = []
+    state["user_context"] = {
+        "user_id": user_id,
+        "session_id": session_id,
+        "name": user_name,
+        "working_directory": working_directory,
+        "preferences": _DEFAULT_PREFERENCES,
+        "permissions": _DEFAULT_PERMISSIONS,
+        "available_tools": available_tools if available_tools is not None else []
     }
+    state["session_info"] = {
+        "created_at": now,
+        "last_updated": now,
+        "total_interactions": 0
+    }
+    return state
 
 
 def update_session_info(state: AgentState) -> Dict[str, Any]:
-    """Update session information in state"""
-    updated_session_info = state["session_info"].copy()
-    updated_session_info["last_updated"] = datetime.now().isoformat()
-    updated_session_info["total_interactions"] = updated_session_info.get("total_interactions", 0) + 1
-    
-    return {"session_info": updated_session_info}
+    """Update session information in state (only the changed keys are returned)"""
+    return {
+        "session_info": {
+            "last_updated": time.time_ns(),
+            "total_interactions": state["session_info"].get("total_interactions", 0) + 1
+        }
+    }
 
 
-def add_tool_result(state: AgentState, tool_name: str, result: Any, success: bool = True) -> Dict[str, Any]:
-    """Add a tool execution result to the state"""
-    tool_result = {
+def tool_result_entry(
+    tool_name: str,
+    success: bool = True,
+    tool_call_id: Optional[str] = None,
+    result: Any = None,
+    completed_at: Optional[int] = None
+) -> Dict[str, Any]:
+    """Build one tool_results record; every writer uses this schema"""
+    return {
         "tool_name": tool_name,
-        "result": result,
+        "tool_call_id": tool_call_id,
         "success": success,
-        "timestamp": datetime.now().isoformat()
+        "result": result,
+        "completed_at": completed_at if completed_at is not None else time.time_ns()
     }
-    
-    updated_tool_results = state["tool_results"].copy()
-    updated_tool_results.append(tool_result)
-    
-    return {"tool_results": updated_tool_results}
+
+
+def add_tool_result(
+    state: AgentState,
+    tool_name: str,
+    result: Any,
+    success: bool = True,
+    tool_call_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Add a tool execution result to the state"""
+    return {"tool_results": [tool_result_entry(tool_name, success, tool_call_id, result)]}
 
 
 def set_error(state: AgentState, error_message: str, error_type: str = "general") -> Dict[str, Any]:
@@ -97,7 +147,7 @@ def set_error(state: AgentState, error_message: str, error_type: str = "general"
     error_info = {
         "message": error_message,
         "type": error_type,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": time.time_ns()
     }
     
     return {"error_info": error_info}
@@ -3,32 +3,55 @@ Enhanced tools package using LangChain's official FileManagementToolkit
 and custom HTML tools with BeautifulSoup for surgical editing.
 """
 
-from langchain_community.agent_toolkits import FileManagementToolkit
-from .html_tools import HTML_TOOLS
-from .shell_tools import SHELL_TOOLS
+import importlib
 from pathlib import Path
-import os
 
-# Initialize the official FileManagementToolkit
-# Restrict to project root for security
-project_root = Path(__file__).parent.parent.parent  # Go up to Etance_Website_Generator
-toolkit = FileManagementToolkit(
-    root_dir=str(project_root),
-    selected_tools=["read_file", "write_file", "list_directory", "copy_file", "move_file"]
-)
-file_management_tools = toolkit.get_tools()
+# Tool groups are built on first access so importing one group (e.g.
+# HTML_TOOLS) doesn't pull in the others' dependencies.
+_LAZY_EXPORTS = {
+    "HTML_TOOLS": ".html_tools",
+    "SHELL_TOOLS": ".shell_tools",
+}
 
-# Combine all reliable tools for the agent
-# Official toolkit for basics + custom HTML tools + shell tools
-ALL_TOOLS = file_management_tools + HTML_TOOLS + SHELL_TOOLS
 
-# Export for easy import
-CUSTOM_TOOLS = ALL_TOOLS
+def _file_management_tools():
+    from langchain_community.agent_toolkits import FileManagementToolkit
+
+    # Initialize the official FileManagementToolkit
+    # Restrict to project root for security
+    project_root = Path(__file__).parent.parent.parent  # Go up to Etance_Website_Generator
+    toolkit = FileManagementToolkit(
+        root_dir=str(project_root),
+        selected_tools=["read_file", "write_file", "list_directory", "copy_file", "move_file"]
+    )
+    return toolkit.get_tools()
+
+
+def _get(name):
+    # Module-level lookups inside this file bypass __getattr__
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    elif name == "file_management_tools":
+        value = _file_management_tools()
+    elif name in ("ALL_TOOLS", "CUSTOM_TOOLS"):
+        # Combine all reliable tools for the agent
+        # Official toolkit for basics + custom HTML tools + shell tools
+        value = _get("file_management_tools") + _get("HTML_TOOLS") + _get("SHELL_TOOLS")
+        globals()["ALL_TOOLS"] = value
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
 
 # Export individual modules for direct access if needed
 __all__ = [
     'CUSTOM_TOOLS',
-    'FILE_TOOLS',
-    'DIRECTORY_TOOLS', 
+    'ALL_TOOLS',
+    'HTML_TOOLS',
     'SHELL_TOOLS'
-] 
\ No newline at end of file
+]
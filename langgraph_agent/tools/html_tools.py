@@ -1,56 +1,299 @@
 from langchain_core.tools import tool
 from pathlib import Path
 from bs4 import BeautifulSoup, NavigableString
-from typing import Union
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+import html
+import os
 import re
+import shutil
+import stat
+import tempfile
+import threading
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Parsed documents keyed by path. Each entry remembers the (inode, mtime,
+# size) it was parsed from, so a change made outside these tools forces a
+# re-parse, while a sequence of edits through them parses the file once.
+_SOUP_CACHE: "OrderedDict[str, Tuple[Tuple[int, int, int], BeautifulSoup]]" = OrderedDict()
+_SOUP_CACHE_SIZE = 32
+# Cached trees are shared and edited in place, so each tool holds this lock
+# from load to save
+_SOUP_LOCK = threading.RLock()
+
+
+def _signature(st: os.stat_result) -> Tuple[int, int, int]:
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _stat_file(html_path: Path) -> Optional[os.stat_result]:
+    """Stat html_path; None unless it is a regular file."""
+    try:
+        st = os.stat(html_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
+
+
+def _cached_soup(key: str, st: os.stat_result) -> Optional[BeautifulSoup]:
+    """Return the cached tree for key if it was parsed from this stat."""
+    entry = _SOUP_CACHE.get(key)
+    if entry is None or entry[0] != _signature(st):
+        return None
+    _SOUP_CACHE.move_to_end(key)
+    return entry[1]
+
+
+def _load_soup(html_path: Path) -> Optional[BeautifulSoup]:
+    """Return the parsed document, or None if html_path is not a file."""
+    st = _stat_file(html_path)
+    if st is None:
+        return None
+    key = str(html_path)
+    soup = _cached_soup(key, st)
+    if soup is not None:
+        return soup
+    soup = BeautifulSoup(html_path.read_text(encoding='utf-8'), 'html.parser')
+    _SOUP_CACHE[key] = (_signature(st), soup)
+    _SOUP_CACHE.move_to_end(key)
+    if len(_SOUP_CACHE) > _SOUP_CACHE_SIZE:
+        _SOUP_CACHE.popitem(last=False)
+    return soup
+
+
+def _selector_for(tag: str, classes: Optional[str], element_id: Optional[str]) -> str:
+    selector = tag
+    if classes:
+        selector += f".{' '.join(classes.split())}"
+    if element_id:
+        selector += f"#{element_id}"
+    return selector
+
+
+# Structural elements listed by find_html_elements when no text is given
+_MAJOR_SELECTOR = 'h1, h2, h3, h4, h5, h6, .title, .brand, .navbar-brand, .header, .footer, #brand, #title'
+
+_MAJOR_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+_MAJOR_CLASSES = frozenset({'title', 'brand', 'navbar-brand', 'header', 'footer'})
+_MAJOR_IDS = frozenset({'brand', 'title'})
+
+
+def _is_major_element(tag) -> bool:
+    """Plain-Python test equivalent to soup.select(_MAJOR_SELECTOR) for one tag."""
+    return (
+        tag.name in _MAJOR_TAGS
+        or not _MAJOR_CLASSES.isdisjoint(tag.get('class') or ())
+        or tag.get('id') in _MAJOR_IDS
+    )
+
+
+@lru_cache(maxsize=256)
+def _search_pattern(search_text: str) -> "re.Pattern[str]":
+    """Compile a find_html_elements search once per distinct text."""
+    return re.compile(search_text, re.I)
+
+
+def _find_with_lexbor(content: str, search_text: str) -> list:
+    """
+    find_html_elements on a Lexbor tree: parsing and the CSS/text walks run
+    in C. Used read-only, so Lexbor's serializer never touches the file.
+    """
+    tree = LexborHTMLParser(content)
+    results = []
+    if search_text:
+        pattern = _search_pattern(search_text)
+        for node in tree.root.traverse(include_text=True):
+            if node.tag != '-text':
+                continue
+            text = node.text_content
+            parent = node.parent
+            if text and pattern.search(text) and parent is not None and parent.tag != '-document':
+                attrs = parent.attributes
+                selector = _selector_for(parent.tag, attrs.get('class'), attrs.get('id'))
+                results.append(f"Selector: '{selector}' - Content: '{text.strip()[:100]}...'")
+    else:
+        # Lexbor reports a node once per selector it matches
+        seen = set()
+        for node in tree.css(_MAJOR_SELECTOR):
+            if node.mem_id in seen:
+                continue
+            seen.add(node.mem_id)
+            if len(seen) > 20:  # Limit to first 20
+                break
+            attrs = node.attributes
+            selector = _selector_for(node.tag, attrs.get('class'), attrs.get('id'))
+            text_content = node.text().strip()[:50]
+            results.append(f"Selector: '{selector}' - Content: '{text_content}...'")
+    return results
+
+
+def _write_html(html_path: Path, text: str) -> None:
+    """
+    Replace html_path with text via a sibling temp file and os.replace, so
+    readers see either the old or the new document, never a truncated one.
+    A symlink is followed and its target replaced, and the file's permission
+    bits are kept.
+    """
+    target = Path(os.path.realpath(html_path))
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(text.encode('utf-8'))
+        shutil.copymode(target, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _save_soup(html_path: Path, soup: BeautifulSoup) -> None:
+    """Write an edited document and keep it cached under the file's new stat."""
+    key = str(html_path)
+    try:
+        _write_html(html_path, str(soup))
+        _SOUP_CACHE[key] = (_signature(os.stat(html_path)), soup)
+    except BaseException:
+        # The cached tree no longer matches the file
+        _SOUP_CACHE.pop(key, None)
+        raise
+
+
+# Splice fast path: a '#id' selector naming exactly one element in the file
+# is edited in the raw text, skipping the parse and the re-serialization of
+# unrelated markup. Anything the patterns below can't prove safe falls back
+# to BeautifulSoup.
+_ID_SELECTOR_RE = re.compile(r'#([A-Za-z][\w-]*)')
+# Elements whose text is not HTML-escaped; always edited through the parser
+_RAW_TEXT_TAGS = frozenset({'script', 'style', 'textarea', 'title'})
+
+
+@lru_cache(maxsize=256)
+def _id_patterns(element_id: str):
+    """Compile (any id reference, open tag, text-only element) patterns for an id."""
+    value = re.escape(element_id)
+    open_tag = r'<([A-Za-z][\w-]*)\s[^<>]*?(?<![\w-])(?i:id)\s*=\s*(["\'])' + value + r'\2[^<>]*>'
+    return (
+        re.compile(r'(?<![\w-])(?i:id)\s*=\s*(["\'])' + value + r'\1'),
+        re.compile(open_tag),
+        re.compile(open_tag + r'([^<]*)</\1\s*>')
+    )
+
+
+def _unique_id_match(content: str, selector: str, text_only: bool):
+    """
+    Match the single element selected by a '#id' selector, or None when the
+    selector is not a bare id, the id appears more than once, or (with
+    text_only) the element has child markup or raw-text content.
+    """
+    selector_match = _ID_SELECTOR_RE.fullmatch(selector.strip())
+    if selector_match is None:
+        return None
+    any_id, open_tag, text_element = _id_patterns(selector_match.group(1))
+    references = any_id.finditer(content)
+    if next(references, None) is None or next(references, None) is not None:
+        return None
+    match = (text_element if text_only else open_tag).search(content)
+    if match is None or (text_only and match.group(1).lower() in _RAW_TEXT_TAGS):
+        return None
+    return match
+
+
+def _splice_content(content: str, selector: str, new_content: str) -> Optional[str]:
+    """Fast path of replace_html_content; None when it does not apply."""
+    match = _unique_id_match(content, selector, text_only=True)
+    if match is None:
+        return None
+    # Same escaping BeautifulSoup applies to a NavigableString
+    return content[:match.start(3)] + html.escape(new_content, quote=False) + content[match.end(3):]
+
+
+def _splice_attribute(content: str, selector: str, attribute: str, new_value: str) -> Optional[str]:
+    """Fast path of replace_html_attribute for an attribute already on the tag."""
+    match = _unique_id_match(content, selector, text_only=False)
+    if match is None or not re.fullmatch(r'[A-Za-z_:][\w:.-]*', attribute):
+        return None
+    attr_re = re.compile(r'(?<=\s)' + re.escape(attribute) + r'\s*=\s*(?:"[^"]*"|\'[^\']*\')', re.I)
+    tag = match.group(0)
+    found = attr_re.findall(tag)
+    if len(found) != 1:
+        return None
+    new_tag = attr_re.sub(lambda _m: f'{attribute}="{html.escape(new_value)}"', tag)
+    return content[:match.start()] + new_tag + content[match.end():]
+
+
+def _write_spliced(html_path: Path, content: str) -> None:
+    _write_html(html_path, content)
+    # The cached tree (if any) predates this edit
+    _SOUP_CACHE.pop(str(html_path), None)
+
 
 @tool
 def replace_html_content(file_path: str, selector: str, new_content: str) -> str:
     """
     Surgically replaces the content of an HTML element identified by a CSS selector.
     This is highly reliable for editing specific parts of a webpage template.
-    
+
     Args:
         file_path (str): The path to the HTML file to edit.
         selector (str): The CSS selector to find the target element (e.g., 'h1.title', 'p#email', '.navbar-brand').
         new_content (str): The new inner HTML or text to place inside the element.
-    
+
     Returns:
         str: Success/failure message with details.
     """
     try:
         html_path = Path(file_path)
-        if not html_path.is_file():
-            return f"Error: File not found at {file_path}"
-
-        # Read and parse the file
-        content = html_path.read_text(encoding='utf-8')
-        soup = BeautifulSoup(content, 'html.parser')
-
-        # Find the target element
-        element = soup.select_one(selector)
-
-        if element:
-            # Replace the element's content
-            element.clear()
-            element.append(NavigableString(new_content))
-            
-            # Write the modified HTML back to the file
-            html_path.write_text(str(soup), encoding='utf-8')
-            return f"Success: Replaced content for selector '{selector}' in {file_path} with: '{new_content}'"
-        else:
-            # Try to find similar elements for debugging
-            all_elements = soup.select('*')
-            similar_selectors = []
-            for elem in all_elements[:10]:  # Check first 10 elements
-                if elem.name and (elem.get('class') or elem.get('id')):
-                    if elem.get('class'):
-                        similar_selectors.append(f"{elem.name}.{' '.join(elem.get('class'))}")
-                    if elem.get('id'):
-                        similar_selectors.append(f"{elem.name}#{elem.get('id')}")
-            
-            suggestion = f" Similar selectors found: {', '.join(similar_selectors[:5])}" if similar_selectors else ""
-            return f"Error: Could not find any element matching the selector '{selector}' in {file_path}.{suggestion}"
+        with _SOUP_LOCK:
+            # Bare '#id' on a text-only element: splice without parsing
+            if _ID_SELECTOR_RE.fullmatch(selector.strip()) and _stat_file(html_path):
+                content = html_path.read_text(encoding='utf-8')
+                spliced = _splice_content(content, selector, new_content)
+                if spliced is not None:
+                    # Already holding this text: nothing to write
+                    if spliced != content:
+                        _write_spliced(html_path, spliced)
+                    return f"Success: Replaced content for selector '{selector}' in {file_path}"
+
+            # Read and parse the file (reused while it is unchanged)
+            soup = _load_soup(html_path)
+            if soup is None:
+                return f"Error: File not found at {file_path}"
+
+            # Find the target element
+            element = soup.select_one(selector)
+
+            if element:
+                # Skip the rewrite when the element already holds exactly this text
+                contents = element.contents
+                if not (len(contents) == 1 and type(contents[0]) is NavigableString and contents[0] == new_content):
+                    # Replace the element's content
+                    element.clear()
+                    element.append(NavigableString(new_content))
+
+                    # Write the modified HTML back to the file
+                    _save_soup(html_path, soup)
+                return f"Success: Replaced content for selector '{selector}' in {file_path}"
+            else:
+                # Try to find similar elements for debugging
+                all_elements = soup.find_all(True, limit=10)
+                similar_selectors = []
+                for elem in all_elements:  # Check first 10 elements
+                    if elem.name and (elem.get('class') or elem.get('id')):
+                        if elem.get('class'):
+                            similar_selectors.append(f"{elem.name}.{' '.join(elem.get('class'))}")
+                        if elem.get('id'):
+                            similar_selectors.append(f"{elem.name}#{elem.get('id')}")
+
+                suggestion = f" Similar selectors found: {', '.join(similar_selectors[:5])}" if similar_selectors else ""
+                return f"Error: Could not find any element matching the selector '{selector}' in {file_path}.{suggestion}"
 
     except Exception as e:
         return f"An unexpected error occurred: {str(e)}"
@@ -60,37 +303,49 @@ def replace_html_attribute(file_path: str, selector: str, attribute: str, new_va
     """
     Replaces an attribute value of an HTML element identified by a CSS selector.
     Useful for updating href links, src attributes, etc.
-    
+
     Args:
         file_path (str): The path to the HTML file to edit.
         selector (str): The CSS selector to find the target element.
         attribute (str): The attribute name to update (e.g., 'href', 'src', 'class').
         new_value (str): The new value for the attribute.
-    
+
     Returns:
         str: Success/failure message with details.
     """
     try:
         html_path = Path(file_path)
-        if not html_path.is_file():
-            return f"Error: File not found at {file_path}"
-
-        # Read and parse the file
-        content = html_path.read_text(encoding='utf-8')
-        soup = BeautifulSoup(content, 'html.parser')
-
-        # Find the target element
-        element = soup.select_one(selector)
-
-        if element:
-            # Update the attribute
-            element[attribute] = new_value
-            
-            # Write the modified HTML back to the file
-            html_path.write_text(str(soup), encoding='utf-8')
-            return f"Success: Updated {attribute}='{new_value}' for selector '{selector}' in {file_path}"
-        else:
-            return f"Error: Could not find any element matching the selector '{selector}' in {file_path}"
+        with _SOUP_LOCK:
+            # Bare '#id' whose tag already carries the attribute: splice
+            # the open tag without parsing
+            if _ID_SELECTOR_RE.fullmatch(selector.strip()) and _stat_file(html_path):
+                content = html_path.read_text(encoding='utf-8')
+                spliced = _splice_attribute(content, selector, attribute, new_value)
+                if spliced is not None:
+                    # Already holding this value: nothing to write
+                    if spliced != content:
+                        _write_spliced(html_path, spliced)
+                    return f"Success: Updated {attribute} for selector '{selector}' in {file_path}"
+
+            # Read and parse the file (reused while it is unchanged)
+            soup = _load_soup(html_path)
+            if soup is None:
+                return f"Error: File not found at {file_path}"
+
+            # Find the target element
+            element = soup.select_one(selector)
+
+            if element:
+                # Skip the rewrite when the attribute already has this value
+                if element.get(attribute) != new_value:
+                    # Update the attribute
+                    element[attribute] = new_value
+
+                    # Write the modified HTML back to the file
+                    _save_soup(html_path, soup)
+                return f"Success: Updated {attribute} for selector '{selector}' in {file_path}"
+            else:
+                return f"Error: Could not find any element matching the selector '{selector}' in {file_path}"
 
     except Exception as e:
         return f"An unexpected error occurred: {str(e)}"
@@ -100,50 +355,55 @@ def find_html_elements(file_path: str, search_text: str = "") -> str:
     """
     Finds HTML elements containing specific text or lists all major elements.
     Useful for discovering the correct CSS selectors to use.
-    
+
     Args:
         file_path (str): The path to the HTML file to analyze.
         search_text (str): Optional text to search for within elements.
-    
+
     Returns:
         str: List of found elements with their selectors and content.
     """
     try:
         html_path = Path(file_path)
-        if not html_path.is_file():
-            return f"Error: File not found at {file_path}"
-
-        # Read and parse the file
-        content = html_path.read_text(encoding='utf-8')
-        soup = BeautifulSoup(content, 'html.parser')
-
-        results = []
-        
-        if search_text:
-            # Search for elements containing the text
-            elements = soup.find_all(string=re.compile(search_text, re.I))
-            for elem in elements:
-                parent = elem.parent
-                if parent and parent.name:
-                    selector = parent.name
-                    if parent.get('class'):
-                        selector += f".{' '.join(parent.get('class'))}"
-                    if parent.get('id'):
-                        selector += f"#{parent.get('id')}"
-                    
-                    results.append(f"Selector: '{selector}' - Content: '{str(elem).strip()[:100]}...'")
-        else:
-            # List major structural elements
-            major_elements = soup.select('h1, h2, h3, h4, h5, h6, .title, .brand, .navbar-brand, .header, .footer, #brand, #title')
-            for elem in major_elements[:20]:  # Limit to first 20
-                selector = elem.name
-                if elem.get('class'):
-                    selector += f".{' '.join(elem.get('class'))}"
-                if elem.get('id'):
-                    selector += f"#{elem.get('id')}"
-                
-                text_content = elem.get_text().strip()[:50]
-                results.append(f"Selector: '{selector}' - Content: '{text_content}...'")
+        with _SOUP_LOCK:
+            if _stat_file(html_path) is None:
+                return f"Error: File not found at {file_path}"
+
+            # Always the same parser for a given install, never whichever tree
+            # happens to be cached, so results don't depend on earlier edits
+            soup = None
+            if LexborHTMLParser is None:
+                soup = _load_soup(html_path) or BeautifulSoup('', 'html.parser')
+
+            results = []
+
+            if soup is None:
+                results = _find_with_lexbor(html_path.read_text(encoding='utf-8'), search_text)
+            elif search_text:
+                # Search for elements containing the text
+                elements = soup.find_all(string=_search_pattern(search_text))
+                for elem in elements:
+                    parent = elem.parent
+                    if parent and parent.name:
+                        selector = parent.name
+                        if parent.get('class'):
+                            selector += f".{' '.join(parent.get('class'))}"
+                        if parent.get('id'):
+                            selector += f"#{parent.get('id')}"
+
+                        results.append(f"Selector: '{selector}' - Content: '{str(elem).strip()[:100]}...'")
+            else:
+                # List major structural elements
+                major_elements = soup.find_all(_is_major_element, limit=20)
+                for elem in major_elements:  # Limit to first 20
+                    selector = elem.name
+                    if elem.get('class'):
+                        selector += f".{' '.join(elem.get('class'))}"
+                    if elem.get('id'):
+                        selector += f"#{elem.get('id')}"
+
+                    text_content = elem.get_text().strip()[:50]
+                    results.append(f"Selector: '{selector}' - Content: '{text_content}...'")
 
         if results:
             return f"Found elements in {file_path}:\n" + "\n".join(results[:15])
@@ -153,4 +413,85 @@ def find_html_elements(file_path: str, search_text: str = "") -> str:
     except Exception as e:
         return f"An unexpected error occurred: {str(e)}"
 
-HTML_TOOLS = [replace_html_content, replace_html_attribute, find_html_elements] 
\ No newline at end of file
+def _apply_edits(soup: BeautifulSoup, edits: List[Dict[str, str]]) -> Tuple[List[str], bool]:
+    """Apply validated apply_html_edits edits to soup; returns (result lines, changed)."""
+    results = []
+    changed = False
+    for number, edit in enumerate(edits, 1):
+        selector = edit.get('selector', '')
+        try:
+            element = soup.select_one(selector) if selector else None
+        except Exception as e:
+            # A bad selector fails only its own edit
+            results.append(f"{number}. Error: Invalid selector '{selector}': {e}")
+            continue
+        if element is None:
+            results.append(f"{number}. Error: No element matches selector '{selector}'")
+        elif 'attribute' in edit:
+            attribute, new_value = edit['attribute'], edit.get('value', '')
+            if element.get(attribute) != new_value:
+                element[attribute] = new_value
+                changed = True
+            results.append(f"{number}. Success: Updated {attribute} for selector '{selector}'")
+        elif 'content' in edit:
+            new_content = edit['content']
+            contents = element.contents
+            if not (len(contents) == 1 and type(contents[0]) is NavigableString and contents[0] == new_content):
+                element.clear()
+                element.append(NavigableString(new_content))
+                changed = True
+            results.append(f"{number}. Success: Replaced content for selector '{selector}'")
+        else:
+            results.append(f"{number}. Error: Edit needs 'content' or 'attribute' and 'value'")
+    return results, changed
+
+
+@tool
+def apply_html_edits(file_path: str, edits: List[Dict[str, str]]) -> str:
+    """
+    Applies several HTML edits to one file with a single parse and a single write.
+    Prefer this over repeated replace_html_content/replace_html_attribute calls on the same file.
+
+    Args:
+        file_path (str): The path to the HTML file to edit.
+        edits (list): Edits applied in order. Each is a dict with a 'selector' and either
+            'content' (new text for the element) or 'attribute' and 'value' (new attribute value),
+            e.g. [{"selector": "h1.title", "content": "Luigi's"}, {"selector": "a.menu", "attribute": "href", "value": "/menu"}].
+
+    Returns:
+        str: One line per edit with its outcome.
+    """
+    try:
+        html_path = Path(file_path)
+        with _SOUP_LOCK:
+            # Read and parse the file (reused while it is unchanged)
+            soup = _load_soup(html_path)
+            if soup is None:
+                return f"Error: File not found at {file_path}"
+
+            # Check every edit before touching the tree: it is the shared
+            # cached one, and a half-applied batch must not linger in it
+            for number, edit in enumerate(edits, 1):
+                if not isinstance(edit, dict) or not all(
+                    isinstance(edit.get(field, ''), str)
+                    for field in ('selector', 'content', 'attribute', 'value')
+                ):
+                    return f"Error: Edit {number} must be a dict of strings with a 'selector' and 'content' or 'attribute' and 'value'"
+
+            try:
+                results, changed = _apply_edits(soup, edits)
+            except BaseException:
+                # Earlier edits may already be in the cached tree
+                _SOUP_CACHE.pop(str(html_path), None)
+                raise
+
+            # Write the modified HTML back to the file once
+            if changed:
+                _save_soup(html_path, soup)
+
+        return f"Applied edits to {file_path}:\n" + "\n".join(results)
+
+    except Exception as e:
+        return f"An unexpected error occurred: {str(e)}"
+
+HTML_TOOLS = [replace_html_content, replace_html_attribute, apply_html_edits, find_html_elements]
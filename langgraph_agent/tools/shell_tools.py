@@ -3,56 +3,187 @@ Shell Tools for LangGraph Agent
 Provides reliable shell command execution with timeout and error handling
 """
 
+import os
+import re
+import selectors
+import shlex
+import signal
 import subprocess
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional
 
 from langchain_core.tools import tool
 
 
-@tool  
+_TIMEOUT_SECONDS = 30
+# Output kept per stream; anything beyond is drained and dropped so a chatty
+# command can neither exhaust memory nor stall on a full pipe
+_MAX_OUTPUT_BYTES = 1024 * 1024
+_READ_CHUNK_BYTES = 64 * 1024
+_TRUNCATED_NOTE = b"\n[output truncated]"
+
+# Characters that need /bin/sh (pipes, redirects, globs, expansions, ...);
+# commands without any of them are exec'd directly
+_SHELL_SYNTAX_RE = re.compile(r"[|&;<>()$`\\*?\[\]{}~#=%!\n]")
+
+# Process groups, killpg and select() on pipes are POSIX-only
+_POSIX = os.name == "posix"
+
+
+def _argv_for(command: str) -> Optional[List[str]]:
+    """Split command into argv when no shell features are needed, else None."""
+    if _SHELL_SYNTAX_RE.search(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    return argv or None
+
+
+def _spawn(command: str, working_dir: str) -> subprocess.Popen:
+    """
+    Start command in its own session (process group on Windows) with piped
+    output. Plain commands skip the intermediate shell; anything the direct
+    exec can't resolve (shell builtins, aliases) is retried through the shell.
+    """
+    options = dict(
+        cwd=working_dir,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    if _POSIX:
+        options["start_new_session"] = True
+    else:
+        options["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    argv = _argv_for(command)
+    if argv is not None:
+        try:
+            return subprocess.Popen(argv, **options)
+        except FileNotFoundError:
+            # A missing working directory raises the same error; only a
+            # missing executable warrants the shell retry
+            if not os.path.isdir(working_dir):
+                raise
+    return subprocess.Popen(command, shell=True, **options)
+
+
+def _collect_output(proc: subprocess.Popen, timeout: float):
+    """
+    Read stdout/stderr as raw bytes until both close or the timeout expires.
+    Returns (stdout, stderr, timed_out); each stream keeps at most
+    _MAX_OUTPUT_BYTES.
+    """
+    buffers = {proc.stdout.fileno(): [], proc.stderr.fileno(): []}
+    sizes = dict.fromkeys(buffers, 0)
+    deadline = time.monotonic() + timeout
+    with selectors.DefaultSelector() as sel:
+        for fd in buffers:
+            sel.register(fd, selectors.EVENT_READ)
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return _joined(buffers, sizes, proc.stdout), _joined(buffers, sizes, proc.stderr), True
+            for key, _ in sel.select(remaining):
+                chunk = os.read(key.fd, _READ_CHUNK_BYTES)
+                if not chunk:
+                    sel.unregister(key.fd)
+                    continue
+                room = _MAX_OUTPUT_BYTES - sizes[key.fd]
+                if room > 0:
+                    buffers[key.fd].append(chunk[:room])
+                sizes[key.fd] += len(chunk)
+    return _joined(buffers, sizes, proc.stdout), _joined(buffers, sizes, proc.stderr), False
+
+
+def _joined(buffers, sizes, stream) -> str:
+    fd = stream.fileno()
+    return _decoded(b"".join(buffers[fd]), sizes[fd])
+
+
+def _decoded(data: bytes, total: int) -> str:
+    """Decode at most _MAX_OUTPUT_BYTES of a stream that produced total bytes."""
+    data = data[:_MAX_OUTPUT_BYTES]
+    if total > _MAX_OUTPUT_BYTES:
+        data += _TRUNCATED_NOTE
+    return data.decode("utf-8", errors="replace")
+
+
+def _run_posix(proc: subprocess.Popen):
+    """Collect output and reap proc; returns (stdout, stderr, timed_out)."""
+    deadline = time.monotonic() + _TIMEOUT_SECONDS
+    stdout, stderr, timed_out = _collect_output(proc, _TIMEOUT_SECONDS)
+    if not timed_out:
+        # Closed pipes don't mean the command is done (it may have
+        # redirected its output), so the wait is bounded by the same deadline
+        try:
+            proc.wait(timeout=max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            timed_out = True
+    if timed_out:
+        # The command runs in its own session, so this also stops
+        # anything it spawned
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.wait()
+    return stdout, stderr, timed_out
+
+
+def _run_windows(proc: subprocess.Popen):
+    """_run_posix for Windows, where pipes can't be polled with select()."""
+    try:
+        stdout, stderr = proc.communicate(timeout=_TIMEOUT_SECONDS)
+        timed_out = False
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        stdout, stderr = proc.communicate()
+        timed_out = True
+    return _decoded(stdout, len(stdout)), _decoded(stderr, len(stderr)), timed_out
+
+
+@tool
 def execute_shell_command(command: str, working_dir: str = ".") -> Dict[str, Any]:
     """
     Execute a shell command and return the result.
-    
+
     Args:
         command: Command to execute
         working_dir: Working directory for command execution
-        
+
     Returns:
         Dictionary with command results
     """
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=30  # 30 second timeout
-        )
-        
-        return {
-            "success": result.returncode == 0,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "return_code": result.returncode,
-            "command": command
-        }
-        
-    except subprocess.TimeoutExpired:
+        proc = _spawn(command, working_dir)
+        with proc:
+            stdout, stderr, timed_out = _run_posix(proc) if _POSIX else _run_windows(proc)
+
+        if timed_out:
+            return {
+                "success": False,
+                "stdout": stdout,
+                "stderr": f"Command timed out after {_TIMEOUT_SECONDS} seconds",
+                "return_code": -1,
+                "command": command
+            }
+
         return {
-            "success": False,
-            "stdout": "",
-            "stderr": "Command timed out after 30 seconds",
-            "return_code": -1,
+            "success": proc.returncode == 0,
+            "stdout": stdout,
+            "stderr": stderr,
+            "return_code": proc.returncode,
             "command": command
         }
+
     except Exception as e:
         return {
             "success": False,
             "stdout": "",
             "stderr": f"Error executing command: {str(e)}",
-            "return_code": -1, 
+            "return_code": -1,
             "command": command
         }
 
@@ -60,4 +191,4 @@ def execute_shell_command(command: str, working_dir: str = ".") -> Dict[str, Any
 # Export shell tools
 SHELL_TOOLS = [
     execute_shell_command
-] 
\ No newline at end of file
+]
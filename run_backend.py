@@ -1,40 +1,161 @@
 import os
-import shutil
+import mimetypes
 import smtplib
+import tempfile
+import zipfile
 import asyncio
 import json
+import threading
+import uuid
+from collections import OrderedDict
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
 from email.message import EmailMessage
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, request, jsonify, send_from_directory, send_file, abort
+from werkzeug.security import safe_join
 from dotenv import load_dotenv
 from langgraph_agent.core import LangGraphAgent
 
+try:
+    import uvloop
+except ImportError:  # optional, and not available on Windows
+    uvloop = None
+
 load_dotenv()
 app = Flask(__name__, static_folder='NFP', static_url_path='')
+# Behind nginx, generated files are handed to the proxy with X-Accel-Redirect
+# instead of being streamed from Python. The value is the URL prefix of an
+# nginx `internal` location aliased to the Generator directory.
+X_ACCEL_PREFIX = os.getenv('X_ACCEL_PREFIX')
 
 agent = None
-try:
-    loop = asyncio.get_running_loop()
-except RuntimeError:
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+# One event loop per process, running in a background thread. Flask serves
+# requests on worker threads, which hand their coroutines to it. Both the
+# loop and the agent are created on first use, so a pre-forking WSGI server
+# (e.g. gunicorn --worker-class gthread) builds them inside each worker.
+loop = None
+_LOOP_LOCK = threading.Lock()
+_AGENT_LOCK = threading.Lock()
+
+def run_async(coro):
+    """Run a coroutine on the shared agent loop and wait for its result."""
+    global loop
+    if loop is None:
+        with _LOOP_LOCK:
+            if loop is None:
+                new_loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+                threading.Thread(target=new_loop.run_forever, name="agent-loop", daemon=True).start()
+                loop = new_loop
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
 
 def initialize_agent():
     global agent
-    if agent is None:
+    if agent is not None:
+        return
+    with _AGENT_LOCK:
+        if agent is not None:
+            return
         print("Initializing LangGraph Agent...")
         model = os.getenv("AGENT_MODEL", "gpt-4o-mini")
         temperature = float(os.getenv("AGENT_TEMPERATURE", 0.5))
         max_iterations = int(os.getenv("AGENT_MAX_ITERATIONS", 100))
         print(f"Agent Config: Model={model}, Temp={temperature}, Max Iterations={max_iterations}")
-        agent = loop.run_until_complete(LangGraphAgent.ainit(
+        agent = run_async(LangGraphAgent.ainit(
             model=model, temperature=temperature, max_iterations=max_iterations
         ))
         print("Agent Initialized.")
 
+# Archives up to this size are built in memory, larger ones spill to a temp file
+_ZIP_SPOOL_BYTES = 32 * 1024 * 1024
+# Formats that are already compressed; DEFLATE only burns CPU on them
+_STORED_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.ico',
+    '.woff', '.woff2', '.mp4', '.webm', '.mp3', '.zip', '.gz', '.br', '.pdf'
+})
+
+def zip_directory(output_path):
+    """
+    Zip output_path into a rewound file object (same layout as
+    shutil.make_archive with root_dir=output_path) without writing the
+    archive to the Generator folder and reading it back.
+    """
+    archive = tempfile.SpooledTemporaryFile(max_size=_ZIP_SPOOL_BYTES)
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for root, dirs, files in os.walk(output_path):
+            dirs.sort()
+            # Directory entries too, so empty directories survive the archive
+            for name in dirs:
+                full_path = os.path.join(root, name)
+                zf.write(full_path, os.path.relpath(full_path, output_path))
+            for name in sorted(files):
+                full_path = os.path.join(root, name)
+                stored = os.path.splitext(name)[1].lower() in _STORED_EXTENSIONS
+                zf.write(
+                    full_path,
+                    os.path.relpath(full_path, output_path),
+                    compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+                )
+    archive.seek(0)
+    return archive
+
+# Background workers for /api/send-zip
+EMAIL_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="email")
+# Send jobs by id, (future, recipient), oldest first; polled by the client
+EMAIL_JOBS = OrderedDict()
+_EMAIL_JOBS_MAX = 256
+_EMAIL_JOBS_LOCK = threading.Lock()
+
+# Authenticated SMTP session reused across sends (one TLS handshake and
+# login instead of one per e-mail); the lock serializes use of the socket
+_SMTP = None
+_SMTP_USER = None
+_SMTP_LOCK = threading.Lock()
+
+def _close_smtp():
+    global _SMTP
+    if _SMTP is not None:
+        try:
+            _SMTP.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        _SMTP = None
+
+def send_email(msg, user, password):
+    """Send msg over the shared Gmail session, reconnecting if it was dropped."""
+    global _SMTP, _SMTP_USER
+    with _SMTP_LOCK:
+        for attempt in range(2):
+            if _SMTP is None or _SMTP_USER != user:
+                _close_smtp()
+                smtp = smtplib.SMTP_SSL('smtp.gmail.com', 465)
+                try:
+                    smtp.login(user, password)
+                except BaseException:
+                    smtp.close()
+                    raise
+                _SMTP, _SMTP_USER = smtp, user
+            try:
+                _SMTP.send_message(msg)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Idle sessions get dropped by the server; retry once fresh
+                _close_smtp()
+                if attempt:
+                    raise
+
 @app.route('/')
 def index():
     return send_from_directory('NFP', 'index.html')
 
+def _compact(value):
+    """Drop null and empty fields (recursively); they only cost the model tokens."""
+    if isinstance(value, dict):
+        value = {k: _compact(v) for k, v in value.items()}
+        return {k: v for k, v in value.items() if v not in (None, '', [], {})}
+    if isinstance(value, list):
+        return [v for v in map(_compact, value) if v not in (None, '', [], {})]
+    return value
+
 @app.route('/api/generate', methods=['POST'])
 def generate_site():
     data = request.get_json()
@@ -42,11 +163,13 @@ def generate_site():
         return jsonify({'status': 'error', 'message': 'No JSON data received.'}), 400
 
     try:
+        initialize_agent()
+
         # Minify JSON to a single line for efficiency
-        user_input_json = json.dumps(data)
+        user_input_json = json.dumps(_compact(data), separators=(',', ':'), ensure_ascii=False)
         print("Sending minified JSON to agent...")
 
-        result = loop.run_until_complete(
+        result = run_async(
             agent.process_request(
                 user_input=user_input_json,
                 user_id='wizard_user',
@@ -78,7 +201,7 @@ def generate_site():
         })
 
     except Exception as e:
-        app.logger.error(f"Error in /api/generate: {e}", exc_info=True)
+        app.logger.error("Error in /api/generate: %s", e, exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/api/download', methods=['POST'])
@@ -92,12 +215,14 @@ def download_zip():
 
     try:
         site_name = os.path.basename(output_path.rstrip('/\\'))
-        zip_path_base = os.path.join('Generator', site_name)
-        shutil.make_archive(zip_path_base, 'zip', output_path)
-        zip_path = f"{zip_path_base}.zip"
-        return send_file(zip_path, as_attachment=True, download_name=f'{site_name}.zip')
+        return send_file(
+            zip_directory(output_path),
+            mimetype='application/zip',
+            as_attachment=True,
+            download_name=f'{site_name}.zip'
+        )
     except Exception as e:
-        app.logger.error(f"Error in /api/download: {e}", exc_info=True)
+        app.logger.error("Error in /api/download: %s", e, exc_info=True)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/api/send-zip', methods=['POST'])
@@ -112,9 +237,6 @@ def send_zip():
 
     try:
         site_name = os.path.basename(output_path.rstrip('/\\'))
-        zip_path_base = os.path.join('Generator', site_name)
-        shutil.make_archive(zip_path_base, 'zip', output_path)
-        zip_path = f"{zip_path_base}.zip"
 
         gmail_user = os.environ.get('GMAIL_USER')
         gmail_pass = os.environ.get('GMAIL_APP_PASSWORD')
@@ -122,31 +244,76 @@ def send_zip():
         if not gmail_user or not gmail_pass:
             return jsonify({'status': 'error', 'message': 'Email server credentials are not configured in .env file.'}), 500
 
+        # Zipping and the SMTP upload run in the background; the response
+        # only confirms the job was accepted, its outcome is polled below
+        job_id = uuid.uuid4().hex
+        future = EMAIL_EXECUTOR.submit(_email_site, email, output_path, site_name, gmail_user, gmail_pass)
+        with _EMAIL_JOBS_LOCK:
+            EMAIL_JOBS[job_id] = (future, email)
+            while len(EMAIL_JOBS) > _EMAIL_JOBS_MAX:
+                EMAIL_JOBS.popitem(last=False)
+
+        return jsonify({
+            'status': 'accepted',
+            'job_id': job_id,
+            'message': f'Website zip file is being sent to {email}.'
+        }), 202
+    except Exception as e:
+        app.logger.error("Error in /api/send-zip: %s", e, exc_info=True)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/send-zip/<job_id>', methods=['GET'])
+def send_zip_status(job_id):
+    """Reports the outcome of a background /api/send-zip job."""
+    with _EMAIL_JOBS_LOCK:
+        job = EMAIL_JOBS.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Unknown or expired job id.'}), 404
+
+    future, email = job
+    if not future.done():
+        return jsonify({'status': 'pending', 'message': f'Website zip file is being sent to {email}.'}), 202
+    error = future.exception()
+    if error is not None:
+        return jsonify({'status': 'error', 'message': str(error)}), 500
+    return jsonify({'status': 'success', 'message': f'Website zip file sent to {email}.'})
+
+def _email_site(email, output_path, site_name, gmail_user, gmail_pass):
+    """Zip a generated site and mail it; runs on EMAIL_EXECUTOR."""
+    try:
         msg = EmailMessage()
         msg['Subject'] = f'Your AI-Generated Website: {site_name}'
         msg['From'] = gmail_user
         msg['To'] = email
         msg.set_content(f'Attached is your generated website "{site_name}". Thank you for using our service!')
 
-        with open(zip_path, 'rb') as f:
-            msg.add_attachment(f.read(), maintype='application', subtype='zip', filename=f'{site_name}.zip')
+        with zip_directory(output_path) as archive:
+            msg.add_attachment(archive.read(), maintype='application', subtype='zip', filename=f'{site_name}.zip')
 
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            smtp.login(gmail_user, gmail_pass)
-            smtp.send_message(msg)
-
-        os.remove(zip_path)
-        return jsonify({'status': 'success', 'message': f'Website zip file sent to {email}.'})
+        send_email(msg, gmail_user, gmail_pass)
+        app.logger.info("Sent %s to %s", site_name, email)
     except Exception as e:
-        app.logger.error(f"Error in /api/send-zip: {e}", exc_info=True)
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+        app.logger.error("Error sending %s to %s: %s", site_name, email, e, exc_info=True)
+        # Kept on the job's future for send_zip_status
+        raise
 
 @app.route('/Generator/<path:path>')
 def serve_generated_site(path):
-    return send_from_directory('Generator', path)
+    if X_ACCEL_PREFIX:
+        # Same base directory send_from_directory uses below
+        full_path = safe_join(os.path.join(app.root_path, 'Generator'), path)
+        if full_path is None or not os.path.isfile(full_path):
+            abort(404)
+        # Empty body; nginx sends the file from its internal location
+        response = app.response_class(mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{X_ACCEL_PREFIX.rstrip('/')}/{quote(path)}"
+        return response
+    return send_from_directory('Generator', path, conditional=True)
 
 if __name__ == '__main__':
     if not os.path.exists('Generator'):
         os.makedirs('Generator')
     initialize_agent()
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # The reloader and debugger are opt-in (FLASK_DEBUG=1); they restart the
+    # process, and reload the agent, whenever a watched file changes
+    app.run(host='0.0.0.0', port=5000, debug=os.getenv('FLASK_DEBUG') == '1', threaded=True)
\ No newline at end of file
@@ -4,7 +4,6 @@ Entry script for the LangGraph Agent System
 Run this to start the interactive LangGraph agent with LangSmith integration
 """
 
-import asyncio
 import sys
 from pathlib import Path
 
@@ -12,7 +11,7 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from langgraph_agent.main import main
+from langgraph_agent.main import run
 
 if __name__ == "__main__":
     print("🚀 Starting LangGraph Agent System...")
@@ -20,7 +19,7 @@ if __name__ == "__main__":
     print("=" * 60)
     
     try:
-        asyncio.run(main())
+        run()
     except KeyboardInterrupt:
         print("\n👋 Agent system terminated by user")
     except Exception as e: